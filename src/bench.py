@@ -0,0 +1,162 @@
+"""
+Headless benchmark: runs the game loop without a window and prints per-phase timings as JSON.
+
+    python src/bench.py --frames 600 --map-size 80 --monsters 200 --zoom 0.5 --rotation 1
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+# Must be set before pygame initializes its display
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep stdout pure JSON
+
+import pygame
+from constants import MAP_W, MAP_H, MONSTER_COUNT, RESOURCE_COUNT, DEFAULT_ZOOM, SIM_TICK_MS
+from engine.game import Game
+
+PHASES = ('handle_events', 'update', 'render', 'flip')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run IsoRealm headless and report frame timings as JSON.')
+    parser.add_argument('--frames', type=int, default=300, help='frames to measure')
+    parser.add_argument('--warmup', type=int, default=30, help='frames to run before measuring')
+    parser.add_argument('--map-size', type=int, nargs='+', metavar=('W', 'H'),
+                        help='map size in tiles (one value for a square map)')
+    parser.add_argument('--monsters', type=int, default=MONSTER_COUNT, help='monster count')
+    parser.add_argument('--resources', type=int, default=RESOURCE_COUNT, help='resource count')
+    parser.add_argument('--zoom', type=float, default=DEFAULT_ZOOM, help='camera zoom')
+    parser.add_argument('--rotation', type=int, default=0, choices=range(4), help='quarter turns of the world')
+    parser.add_argument('--quality', type=int, default=0, help='fixed quality governor level (0 is full quality)')
+    parser.add_argument('--no-debug', action='store_true', help='run with the debug overlay (F1) off')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the map and entities')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    return parser.parse_args(argv)
+
+
+def summarize(samples):
+    """Get total/mean/percentile figures (in ms) for a list of timings in seconds"""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def percentile(p):
+        return ordered[min(count - 1, int(p / 100 * count))] * 1000
+
+    return {
+        'total_ms': round(sum(ordered) * 1000, 3),
+        'mean_ms': round(sum(ordered) * 1000 / count, 4),
+        'p50_ms': round(percentile(50), 4),
+        'p95_ms': round(percentile(95), 4),
+        'p99_ms': round(percentile(99), 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+
+def setup_game(args):
+    """Build the game for the requested world and view"""
+    map_w, map_h = MAP_W, MAP_H
+    if args.map_size:
+        map_w = args.map_size[0]
+        map_h = args.map_size[1] if len(args.map_size) > 1 else map_w
+
+    random.seed(args.seed)
+    game = Game(map_w, map_h, args.monsters, args.resources, args.seed)
+    game.show_debug = not args.no_debug
+    game.autosaver.interval_ms = 0  # No save files from benchmark runs
+
+    for _ in range(args.rotation):
+        game.rotation = game.world_rotator.rotate_world_90(
+            game.game_map, game.camera, game.player, game.monsters, game.resources
+        )
+    game.camera.set_zoom(args.zoom)
+
+    # Hold the quality level fixed so runs measure the same work
+    game.quality.set_enabled(False)
+    game.quality.set_level(args.quality)
+    game.apply_quality()
+    return game
+
+
+def run_frame(game, dt, timings=None):
+    """Run one frame of the game loop, timing each phase when timings is given"""
+    clock = time.perf_counter
+    start = clock()
+    game.handle_events()
+    after_events = clock()
+    game.update(dt)
+    after_update = clock()
+    game.render(present=False)
+    after_render = clock()
+    game.present()
+    end = clock()
+
+    if timings is not None:
+        timings['handle_events'].append(after_events - start)
+        timings['update'].append(after_update - after_events)
+        timings['render'].append(after_render - after_update)
+        timings['flip'].append(end - after_render)
+        timings['frame'].append(end - start)
+
+
+def run(args):
+    # Keep the game's own prints off stdout so the report stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        game = setup_game(args)
+
+        # One simulation tick per frame, so runs are comparable no matter how fast the machine is
+        dt = SIM_TICK_MS
+        for _ in range(args.warmup):
+            run_frame(game, dt)
+
+        timings = {phase: [] for phase in PHASES + ('frame',)}
+        for _ in range(args.frames):
+            run_frame(game, dt, timings)
+
+    map_size = [game.game_map.w, game.game_map.h]
+
+    frame_stats = summarize(timings['frame'])
+    report = {
+        'config': {
+            'frames': args.frames,
+            'warmup': args.warmup,
+            'map_size': map_size,
+            'monsters': len(game.monsters),
+            'resources': len(game.resources),
+            'zoom': game.camera.zoom,
+            'rotation': game.rotation,
+            'debug': game.show_debug,
+            'quality': game.quality.level,
+            'seed': args.seed,
+            'video_driver': pygame.display.get_driver(),
+            'pygame': pygame.version.ver,
+            'python': sys.version.split()[0]
+        },
+        'phases': {phase: summarize(timings[phase]) for phase in PHASES},
+        'frame': frame_stats,
+        'fps': round(1000 / frame_stats['mean_ms'], 2) if frame_stats['mean_ms'] else None
+    }
+    pygame.quit()
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.frames < 1:
+        raise SystemExit('--frames must be at least 1')
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 # camera.py - instant zoom (no animation)
 import pygame
-from constants import TILE_W, TILE_H, SCREEN_W, SCREEN_H, ZOOM_MIN, ZOOM_MAX, ZOOM_SPEED, DEFAULT_ZOOM
+from constants import TILE_W, TILE_H, SCREEN_W, SCREEN_H, ZOOM_MIN, ZOOM_MAX, ZOOM_SPEED, DEFAULT_ZOOM, \
+    CULL_MARGIN_TILES, MAP_W, MAP_H
+from utils.loader import rotate_world_coords_90_cw, unrotate_world_coords_90_cw
 
 class Camera:
     def __init__(self):
@@ -11,6 +13,39 @@ class Camera:
         self.zoom = DEFAULT_ZOOM
         self.target_zoom = DEFAULT_ZOOM
 
+        # World rotation is only a view transform: world coordinates never change, the camera
+        # turns them into view coordinates (the map as seen after `rotation` quarter turns)
+        self.rotation = 0
+        self.map_w = MAP_W
+        self.map_h = MAP_H
+
+    def set_map_size(self, map_w, map_h):
+        """Set the size of the world the view rotates around"""
+        self.map_w = map_w
+        self.map_h = map_h
+
+    def set_rotation(self, rotation):
+        """Set how many quarter turns clockwise the world is viewed at"""
+        self.rotation = rotation % 4
+
+    def get_view_size(self):
+        """Get the map size in view coordinates (the sides swap on odd rotations)"""
+        if self.rotation % 2:
+            return self.map_h, self.map_w
+        return self.map_w, self.map_h
+
+    def world_to_view(self, world_x, world_y):
+        """Convert world coordinates to view coordinates (exact, also for fractional positions)"""
+        if not self.rotation:
+            return world_x, world_y
+        return rotate_world_coords_90_cw(world_x, world_y, self.map_w, self.map_h, self.rotation)
+
+    def view_to_world(self, view_x, view_y):
+        """Convert view coordinates back to world coordinates"""
+        if not self.rotation:
+            return view_x, view_y
+        return unrotate_world_coords_90_cw(view_x, view_y, self.map_w, self.map_h, self.rotation)
+
     def update(self, target_world_x, target_world_y):
         """Update camera position instantly - no zoom smoothing"""
         # Set zoom instantly (no smoothing)
@@ -22,6 +57,7 @@ class Camera:
         effective_tile_h = TILE_H * self.zoom
 
         # Calculate target screen position for the target entity
+        target_world_x, target_world_y = self.world_to_view(target_world_x, target_world_y)
         self.target_x = (target_world_x - target_world_y) * (effective_tile_w // 2)
         self.target_y = (target_world_x + target_world_y) * (effective_tile_h // 2)
 
@@ -30,7 +66,11 @@ class Camera:
         self.y = self.target_y
 
     def world_to_screen(self, world_x, world_y):
-        """Convert world (grid) coordinates to screen coordinates with zoom"""
+        """Convert world (grid) coordinates to screen coordinates with zoom and rotation"""
+        return self.view_to_screen(*self.world_to_view(world_x, world_y))
+
+    def view_to_screen(self, world_x, world_y):
+        """Convert view (rotated grid) coordinates to screen coordinates with zoom"""
         # Calculate effective tile dimensions based on current zoom
         effective_tile_w = TILE_W * self.zoom
         effective_tile_h = TILE_H * self.zoom
@@ -41,7 +81,11 @@ class Camera:
         return int(screen_x), int(screen_y)
 
     def screen_to_world(self, screen_x, screen_y):
-        """Convert screen coordinates to world (grid) coordinates with zoom"""
+        """Convert screen coordinates to world (grid) coordinates with zoom and rotation"""
+        return self.view_to_world(*self.screen_to_view(screen_x, screen_y))
+
+    def screen_to_view(self, screen_x, screen_y):
+        """Convert screen coordinates to view (rotated grid) coordinates with zoom"""
         # Calculate effective tile dimensions based on zoom
         effective_tile_w = TILE_W * self.zoom
         effective_tile_h = TILE_H * self.zoom
@@ -133,6 +177,7 @@ class Camera:
 
     def center_on(self, world_x, world_y):
         """Immediately center camera on position"""
+        world_x, world_y = self.world_to_view(world_x, world_y)
         effective_tile_w = TILE_W * self.zoom
         effective_tile_h = TILE_H * self.zoom
 
@@ -155,6 +200,30 @@ class Camera:
         return (-margin <= screen_x <= SCREEN_W + margin and
                 -margin <= screen_y <= SCREEN_H + margin)
 
+    def get_cull_margin(self):
+        """Get the culling margin in screen pixels for the current zoom"""
+        return int(CULL_MARGIN_TILES * TILE_H * self.zoom)
+
+    def get_visible_tile_bounds(self, map_w, map_h, margin=None):
+        """Get the (min_x, max_x, min_y, max_y) view tile range covering the screen plus a pixel margin"""
+        if margin is None:
+            margin = self.get_cull_margin()
+
+        # Project the margin-expanded screen corners back into the world
+        left, top = -margin, -margin
+        right, bottom = SCREEN_W + margin, SCREEN_H + margin
+        corners = [self.screen_to_view(sx, sy)
+                   for sx, sy in ((left, top), (right, top), (left, bottom), (right, bottom))]
+        xs = [corner[0] for corner in corners]
+        ys = [corner[1] for corner in corners]
+
+        # Pad by one tile for the flooring in screen_to_view, then clamp to the map
+        min_x = max(0, min(xs) - 1)
+        max_x = min(map_w - 1, max(xs) + 1)
+        min_y = max(0, min(ys) - 1)
+        max_y = min(map_h - 1, max(ys) + 1)
+        return min_x, max_x, min_y, max_y
+
     def get_effective_tile_size(self):
         """Get the current tile size based on zoom"""
         return TILE_W * self.zoom, TILE_H * self.zoom
\ No newline at end of file
@@ -0,0 +1,80 @@
+# engine/dirty_rects.py
+"""
+Tracks which parts of the screen changed since the last frame for dirty-rect presentation.
+"""
+import pygame
+from constants import SCREEN_W, SCREEN_H, DIRTY_RECTS_MAX_COVERAGE
+
+
+class DirtyRectTracker:
+    def __init__(self, max_coverage=DIRTY_RECTS_MAX_COVERAGE):
+        self.screen_rect = pygame.Rect(0, 0, SCREEN_W, SCREEN_H)
+        self.max_area = SCREEN_W * SCREEN_H * max_coverage
+
+        # key -> (rect, signature) for everything drawn last frame
+        self.previous = {}
+        self.current = {}
+        self.dirty = []
+
+        # Anything that moves the whole view (camera, zoom, rotation, ...)
+        self.view_state = None
+        self.full_redraw = True
+
+    def begin_frame(self, view_state):
+        """Start tracking a frame; a changed view state forces a full redraw"""
+        if view_state != self.view_state:
+            self.view_state = view_state
+            self.full_redraw = True
+        self.current = {}
+        self.dirty = []
+
+    def track(self, key, rect, signature=None):
+        """Record something drawn this frame; a signature of None means it changes every frame"""
+        self.current[key] = (rect, signature)
+        old = self.previous.get(key)
+        if old is None:
+            self.dirty.append(rect)
+        elif signature is None or old[1] != signature or old[0] != rect:
+            # Erase the old position and paint the new one
+            self.dirty.append(old[0])
+            self.dirty.append(rect)
+
+    def end_frame(self):
+        """Finish tracking; returns the rects to redraw, or None for a full redraw"""
+        # Anything that disappeared (killed, collected, culled) leaves a hole to repaint
+        for key, (rect, _) in self.previous.items():
+            if key not in self.current:
+                self.dirty.append(rect)
+        self.previous = self.current
+
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+
+        rects = self.merge_rects(self.dirty)
+        if sum(rect.width * rect.height for rect in rects) > self.max_area:
+            return None
+        return rects
+
+    def invalidate(self):
+        """Force the next frame to be redrawn in full"""
+        self.full_redraw = True
+
+    def merge_rects(self, rects):
+        """Clip rects to the screen and merge any that overlap"""
+        merged = []
+        for rect in rects:
+            rect = rect.clip(self.screen_rect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+
+            # Fold in everything this rect touches until nothing overlaps it
+            i = 0
+            while i < len(merged):
+                if merged[i].colliderect(rect):
+                    rect = rect.union(merged.pop(i))
+                    i = 0
+                else:
+                    i += 1
+            merged.append(rect)
+        return merged
@@ -3,16 +3,22 @@ import pygame
 import random
 from constants import *
 from world.game_map import GameMap
+from world.chunk_store import ChunkStore
 from engine.camera import Camera
 from engine.renderer import Renderer
 from engine.controls import Controls
 from entities.player import Player
 from utils.loader import *
 from utils.fallbacks import *
+from utils.atlas import TextureAtlas
 from entities.entity_manager import EntityManager
 from engine.player_manager import PlayerController
 from world.world_manager import WorldRotator
-from engine.render_manager import RenderManager
+from engine.render_manager import RenderManager, ItemLayer, ActorLayer, GridDotLayer, UILayer
+from engine.terrain_layer import TerrainLayer
+from engine.profiler import FrameProfiler
+from engine.quality import QualityGovernor
+from engine.save_game import Autosaver, read_snapshot, restore_game
 from ui.hud import HUD
 from ui.ui import UI
 from ui.debug_panel import DebugPanel
@@ -20,7 +26,8 @@ from ui.inventory import Inventory
 from ui.ui_manager import UIManager
 
 class Game:
-    def __init__(self):
+    def __init__(self, map_w=MAP_W, map_h=MAP_H, monster_count=MONSTER_COUNT, resource_count=RESOURCE_COUNT,
+                 seed=WORLD_SEED, world_file=WORLD_FILE):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
         pygame.display.set_caption('IsoRealm - Static Resources')
@@ -34,27 +41,58 @@ class Game:
         # Initialize managers
         self.player_controller = PlayerController(self.controls)  # <-- ADD THIS LINE
         self.world_rotator = WorldRotator()                       # If you created this
-        self.render_manager = RenderManager(self.camera)          # If you created this
+        self.profiler = FrameProfiler()  # Only collects while debug (F1) is on
+        self.render_manager = RenderManager(self.camera, self.renderer, self.screen, self.profiler)
+        self.quality = QualityGovernor()  # Trades optional effects for frame time (F3)
+        self.autosaver = Autosaver(AUTOSAVE_FILE, AUTOSAVE_INTERVAL_MS)  # Also writes F5 quick saves
 
         self.rotation = 0  # 0 = 0°, 1 = 90°, 2 = 180°, 3 = 270°
         self.rotation_timer = 0  # Timer for smooth rotation
         self.target_rotation = 0  # Target rotation for animation
         self.is_rotating = False  # Whether rotation animation is active
 
+        # Fixed-step simulation: leftover real time not yet simulated, and how far
+        # rendering is between the last two ticks (1.0 draws the latest tick as is)
+        self.sim_accumulator = 0.0
+        self.interpolation = 1.0
+
         # Load assets
         self.load_assets()
 
         # Create game world
-        self.game_map = GameMap()  # <-- CREATE MAP HERE
+        # A world file keeps the map and its entities between runs; a saved world brings its own size
+        self.world_store = None
+        new_world = True
+        if world_file:
+            if seed is None:
+                seed = random.getrandbits(64)
+            self.world_store, new_world = ChunkStore.open_or_create(world_file, map_w, map_h, seed)
+            map_w, map_h = self.world_store.w, self.world_store.h
+            print(f"World file: {'created' if new_world else 'opened'} {world_file} ({map_w}x{map_h})")
+
+        self.game_map = GameMap(map_w, map_h, seed, store=self.world_store)  # <-- CREATE MAP HERE
+        self.camera.set_map_size(map_w, map_h)  # The view rotates around this map
+
+        # Pre-rendered ground, rebuilt per chunk when a tile changes
+        self.terrain_layer = TerrainLayer(self.tileset, self.renderer)
+        self.game_map.add_tile_listener(self.terrain_layer.invalidate_tile)
 
         self.entity_manager = EntityManager(
         self.game_map, 
         self.player_animations, 
         self.monster_animations, 
-        self.resource_sprite
+        self.resource_sprite,
+        monster_count,
+        resource_count
         )
 
-        self.entity_manager.initialize(MAP_W // 2, MAP_H // 2)
+        self.entity_manager.initialize(map_w // 2, map_h // 2, spawn=new_world)
+        self.game_map.add_chunk_listener(self.entity_manager.on_chunk)
+        self.game_map.set_focus(map_w // 2, map_h // 2)
+        if self.world_store is not None and new_world:
+            # Write the new world's entities out now: the ones away from the player load with their chunks
+            self.entity_manager.save_all()
+            self.world_store.flush()
         self.player = self.entity_manager.player
         self.monsters = self.entity_manager.monsters
         self.resources = self.entity_manager.resources
@@ -74,6 +112,13 @@ class Game:
         self.inventory = Inventory()
         self.ui_manager = UIManager(self.screen)
 
+        # Render pipeline layers, back to front
+        self.render_manager.add_layer(self.terrain_layer)
+        self.render_manager.add_layer(ItemLayer(self.entity_manager.index))
+        self.render_manager.add_layer(ActorLayer(self.player, self.entity_manager.index))
+        self.render_manager.add_layer(GridDotLayer(self))
+        self.render_manager.add_layer(UILayer(self))
+
     def load_assets(self): # kat
         """Load all game assets"""
         # Only create directories
@@ -127,6 +172,35 @@ class Game:
         if not self.resource_sprite:
             self.resource_sprite = create_fallback_sprite((200, 180, 60), 32)
 
+        # Pack every frame and tile into a few atlas pages; the dicts keep their shape
+        self.atlas = TextureAtlas()
+        if ATLAS_ENABLED:
+            self.atlas.pack(list(self.tileset.values()) +
+                            get_animation_frames(self.player_animations) +
+                            get_animation_frames(self.monster_animations) +
+                            [self.resource_sprite])
+            self.tileset = self.atlas.pack_dict(self.tileset)
+            self.player_animations = self.atlas.pack_animations(self.player_animations)
+            self.monster_animations = self.atlas.pack_animations(self.monster_animations)
+            self.resource_sprite = self.atlas.get_view(self.resource_sprite)
+            atlas_stats = self.atlas.get_stats()
+            print(f"Texture atlas: {atlas_stats['surfaces']} surfaces in {atlas_stats['pages']} page(s), "
+                  f"{atlas_stats['page_bytes'] // 1024} KB ({atlas_stats['source_bytes'] // 1024} KB unpacked, "
+                  f"{atlas_stats['fill'] * 100:.0f}% filled)")
+
+        # Walking trail copies of the player's frames, so walking doesn't copy surfaces
+        self.player_trail_frames = build_trail_frames(self.player_animations)
+        self.renderer.add_trail_frames(self.player_trail_frames)
+
+        # Pre-scaled copies of every tile and frame for the common zoom levels
+        mipmap_sources = list(self.tileset.values())
+        mipmap_sources += get_animation_frames(self.player_animations)
+        mipmap_sources += get_animation_frames(self.monster_animations)
+        mipmap_sources.append(self.resource_sprite)
+        for trail_frames in self.player_trail_frames.values():
+            mipmap_sources += trail_frames
+        self.renderer.scale_cache.add_mipmaps(build_mipmaps(mipmap_sources))
+
 # [file name]: game.py (correction)
 # Update the handle_events method to pass the current key state correctly
 
@@ -166,6 +240,23 @@ class Game:
                 elif event.key == pygame.K_0:
                     self.camera.reset_zoom()  # Instant zoom reset
 
+                # Toggle dirty-rect presentation
+                elif event.key == pygame.K_F2:
+                    self.render_manager.set_dirty_rects(not self.render_manager.dirty_rects)
+                    print(f"Dirty-rect mode: {'on' if self.render_manager.dirty_rects else 'off'}")
+
+                # Quick save and load
+                elif event.key == pygame.K_F5:
+                    self.save_game(SAVE_FILE)
+                elif event.key == pygame.K_F9:
+                    self.load_game(SAVE_FILE)
+
+                # Toggle the quality governor
+                elif event.key == pygame.K_F3:
+                    if self.quality.set_enabled(not self.quality.enabled):
+                        self.apply_quality()
+                    print(f"Quality governor: {'on' if self.quality.enabled else 'off'}")
+
                 # Handle sprite offset adjustment keys
                 elif event.key == pygame.K_UP:
                     self.sprite_offset -= 5  # Move sprites up
@@ -205,14 +296,20 @@ class Game:
 
     # [file name]: game.py (update update method)
     def update(self, dt):
-        """Update game state"""
+        """Update game state by one step of dt milliseconds"""
+        profiler = self.profiler
+        start = profiler.start()
+
+        # Positions at the start of the step, for render interpolation
+        self.entity_manager.begin_tick()
+
         # Update controls
         self.controls.update(dt)
 
         # Handle player movement
         keys = pygame.key.get_pressed()
         moved, (dx, dy) = self.player_controller.handle_movement(
-            self.player, self.game_map, keys
+            self.player, self.game_map, keys, self.rotation
         )
 
         # Handle auto idle
@@ -222,136 +319,130 @@ class Game:
         # because actions are now handled in handle_events when keys are pressed
         # This prevents continuous action triggering
 
+        start = profiler.lap('update.input', start)
+
         # Update animations
         self.entity_manager.update(dt)
+        start = profiler.lap('update.entities', start)
+
+        # Keep the map chunks around the player loaded
+        self.game_map.set_focus(self.player.x, self.player.y)
 
         # Update camera
         self.camera.update(self.player.x, self.player.y)
+        start = profiler.lap('update.camera', start)
         
         # Update UI
         self.ui_manager.update(self.inventory)
-
-    def render(self):
-        """Render the game"""
-        self.renderer.clear()
-    
-        # Get the draw list
-        draw_list = self.prepare_draw_list()
-    
-        # Sort by depth (y then x for isometric)
-        draw_list.sort(key=lambda item: (item['depth'], item.get('entity_type', '')))
-    
-        # Draw everything in sorted order
-        for item in draw_list:
-            sx, sy = item['screen_x'], item['screen_y']
-    
-            if item['type'] == 'tile':
-                x, y = item['map_x'], item['map_y']
-                tile_type = self.game_map.tiles[x][y]
-                img = self.tileset.get(tile_type, list(self.tileset.values())[0])
-    
-                # Draw tile EXACTLY centered
-                self.renderer.draw_tile(img, sx, sy, self.camera.zoom)
-    
-            elif item['type'] == 'resource':
-                resource = item['entity']
-                self.renderer.draw_entity(resource, sx, sy, 'resource', self.camera.zoom)
-    
-            elif item['type'] == 'monster':
-                monster = item['entity']
-                self.renderer.draw_entity(monster, sx, sy, 'monster', self.camera.zoom)
-    
-            elif item['type'] == 'player':
-                self.renderer.draw_entity(self.player, sx, sy, 'player', self.camera.zoom)
-    
-        # Draw grid dots EXACTLY at tile centers
-        tile_list = [item for item in draw_list if item['type'] == 'tile']
-        self.debug_panel.draw_grid_dots(tile_list, self.camera.zoom, self.show_debug)
-    
-        # Draw HUD and UI with sprite offset info
-        resources_left = len([r for r in self.resources if not r.collected])
-        self.hud.draw_hud(self.player, resources_left, self.rotation, self.camera.zoom, self.sprite_offset)
-    
-        if self.show_debug:
-            self.debug_panel.draw_debug_info(self.sprite_status, self.all_loaded_files, self.clock, self.player, self.camera.zoom, self.show_debug)
-
-        # Draw UI (on top of everything else)
-        self.ui_manager.draw(self.inventory)
-    
-        pygame.display.flip()
-
-    def prepare_draw_list(self):
-        """Prepare a list of everything to draw with depth information"""
-        draw_list = []
-    
-        # Add tiles first
-        for x in range(self.game_map.w):
-            for y in range(self.game_map.h):
-                sx, sy = self.camera.world_to_screen(x, y)
-                # Calculate depth based on isometric position
-                depth = x + y  # Basic isometric depth
-                draw_list.append({
-                    'type': 'tile',
-                    'depth': depth,
-                    'screen_x': sx,
-                    'screen_y': sy,
-                    'map_x': x,
-                    'map_y': y
-                })
-    
-        # Add resources
-        for resource in self.resources:
-            if not resource.collected:
-                sx, sy = self.camera.world_to_screen(resource.x, resource.y)
-                # Resources should appear on top, so add a small offset to depth
-                depth = resource.x + resource.y + 0.1
-                draw_list.append({
-                    'type': 'resource',
-                    'depth': depth,
-                    'screen_x': sx,
-                    'screen_y': sy,
-                    'entity': resource,
-                    'entity_type': 'resource'
-                })
-    
-        # Add monsters
-        for monster in self.monsters:
-            sx, sy = self.camera.world_to_screen(monster.x, monster.y)
-            # Monsters should appear on top of resources
-            depth = monster.x + monster.y + 0.2
-            draw_list.append({
-                'type': 'monster',
-                'depth': depth,
-                'screen_x': sx,
-                'screen_y': sy,
-                'entity': monster,
-                'entity_type': 'monster'
-            })
-    
-        # Add player (always on top)
-        sx, sy = self.camera.world_to_screen(self.player.x, self.player.y)
-        depth = self.player.x + self.player.y + 0.3
-        draw_list.append({
-            'type': 'player',
-            'depth': depth,
-            'screen_x': sx,
-            'screen_y': sy,
-            'entity': self.player,
-            'entity_type': 'player'
-        })
-    
-        return draw_list
+        start = profiler.lap('update.ui', start)
+
+        # Autosave (a world file is saved as it pages instead)
+        if self.world_store is None:
+            self.autosaver.update(self, dt)
+        profiler.stop('update.autosave', start)
+
+    def simulate(self, ticks):
+        """Run fixed simulation ticks without rendering (faster than real time, e.g. for tests)"""
+        for _ in range(ticks):
+            self.update(SIM_TICK_MS)
+        self.interpolation = 1.0
+
+    def advance(self, frame_ms):
+        """Run as many fixed ticks as the elapsed real time covers; returns the tick count"""
+        self.sim_accumulator += min(frame_ms, SIM_MAX_FRAME_MS)
+        ticks = 0
+        while self.sim_accumulator >= SIM_TICK_MS:
+            self.update(SIM_TICK_MS)
+            self.sim_accumulator -= SIM_TICK_MS
+            ticks += 1
+        self.interpolation = self.sim_accumulator / SIM_TICK_MS
+        return ticks
+
+    def render(self, present=True):
+        """Render the game (and show it, unless present is False)"""
+        # Follow the player's interpolated position so the camera glides with it
+        self.camera.update(*self.player.get_render_position(self.interpolation))
+        self.render_manager.render(self.game_map, self.rotation, self.interpolation)
+        if present:
+            self.present()
+
+    def present(self):
+        """Show the last rendered frame"""
+        start = self.profiler.start()
+        self.render_manager.present()
+        self.profiler.stop('flip', start)
 
     # game.py - in the run() method
+    def apply_quality(self):
+        """Push the quality governor's current settings to the systems they control"""
+        settings = self.quality.settings
+        if self.renderer.apply_quality(settings):
+            # Terrain chunks were drawn from the old scaled tiles
+            self.terrain_layer.invalidate_all()
+        self.entity_manager.distant_anim_step = settings['distant_anim_step']
+        self.render_manager.dirty_tracker.invalidate()  # Effects appear or vanish everywhere at once
+
     def run(self):
         """Main game loop"""
+        try:
+            self.loop()
+        finally:
+            # Also after an error: the world file only has what was written back to it
+            self.close_world()
+            pygame.quit()
+
+    def loop(self):
+        """Run frames until the game quits"""
         while self.running:
-            dt = self.clock.tick(FPS)  # dt is in milliseconds      
-            # Cap dt to prevent large jumps
-            dt = min(dt, 100)  # Cap at 100ms to prevent huge jumps
+            frame_ms = self.clock.tick(FPS)  # Real time since the last frame, in milliseconds
+
+            # Time each phase for the debug panel's frame graph (no-ops while debug is off)
+            profiler = self.profiler
+            profiler.set_enabled(self.show_debug)
+            profiler.begin_frame()
             
+            start = profiler.start()
             self.handle_events()
-            self.update(dt)
+            profiler.stop('events', start)
+
+            # The simulation always steps SIM_TICK_MS at a time, however long the frame took
+            self.advance(frame_ms)
             self.render()
-    
-        pygame.quit()
\ No newline at end of file
+            profiler.end_frame()
+
+            # Work time of the last frame, without the wait for the frame cap
+            if self.quality.record_frame(self.clock.get_rawtime()):
+                self.apply_quality()
+
+    def save_game(self, path):
+        """Save the game in the background (see engine/save_game.py)"""
+        if self.world_store is not None:
+            print("Saves are for in-memory worlds: this one is kept in its world file")
+            return False
+        return self.autosaver.save(self, path)
+
+    def load_game(self, path):
+        """Replace the game with a saved one"""
+        if self.world_store is not None:
+            print("Saves are for in-memory worlds: this one is kept in its world file")
+            return False
+        self.autosaver.wait()
+        try:
+            snapshot = read_snapshot(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load game from {path}: {e}")
+            return False
+        restore_game(self, snapshot)
+        self.sim_accumulator = 0.0
+        print(f"Loaded game from {path}")
+        return True
+
+    def close_world(self):
+        """Finish any save in progress, write the world back to its file (if it has one) and close it"""
+        self.autosaver.wait()
+        if self.world_store is None:
+            return
+        self.entity_manager.save_all()
+        self.game_map.save()
+        self.world_store.close()
+        self.world_store = None
\ No newline at end of file
@@ -4,6 +4,7 @@ Handles player movement and actions.
 """
 import pygame
 from constants import *
+from utils.loader import rotate_movement_90_cw
 
 # [file name]: player_manager.py (update)
 # Update the handle_actions method to not require keys parameter for certain actions
@@ -12,8 +13,8 @@ class PlayerController:
     def __init__(self, controls):
         self.controls = controls
         
-    def handle_movement(self, player, game_map, keys):
-        """Handle player movement WITHOUT rotation adjustment"""
+    def handle_movement(self, player, game_map, keys, rotation=0):
+        """Handle player movement; keys move the player relative to the screen at any rotation"""
         
         if self.controls.move_cooldown > 0:
             return False, (0, 0)
@@ -37,8 +38,9 @@ class PlayerController:
         if self.controls.move_cooldown > 0:
             return False, (0, 0)
 
-        # NO rotation adjustment - movement is always relative to screen
-        if player.move(dx, dy, game_map):
+        # Keys move in view coordinates; turn that into a world step by undoing the view rotation
+        world_dx, world_dy = rotate_movement_90_cw(dx, dy, -rotation)
+        if player.move(world_dx, world_dy, game_map):
             self.controls.move_cooldown = MOVE_COOLDOWN
             self.controls.last_move_time = self.controls.game_time
             return True, (dx, dy)
@@ -0,0 +1,116 @@
+# engine/profiler.py
+"""
+Per-frame phase timings kept in ring buffers for the debug panel's frame graph.
+"""
+import time
+from constants import PROFILER_HISTORY
+
+# Phases in stacking order (bottom to top of the graph) with their graph colors
+PHASES = (
+    ('events', (120, 160, 255)),
+    ('update.input', (90, 200, 220)),
+    ('update.entities', (80, 220, 140)),
+    ('update.camera', (170, 230, 90)),
+    ('update.ui', (230, 220, 80)),
+    ('update.autosave', (200, 200, 200)),
+    ('render.collect', (250, 170, 70)),
+    ('render.world', (240, 110, 80)),
+    ('render.overlay', (220, 90, 170)),
+    ('flip', (160, 110, 240))
+)
+
+
+class FrameProfiler:
+    def __init__(self, history=PROFILER_HISTORY):
+        self.history = history
+        self.phases = [name for name, _ in PHASES]
+        self.colors = dict(PHASES)
+
+        # Off until debug is on; every hook returns straight away while disabled
+        self.enabled = False
+
+        # phase -> seconds per frame, written round-robin at self.index
+        self.samples = {phase: [0.0] * history for phase in self.phases}
+        self.totals = [0.0] * history
+        self.index = 0
+        self.count = 0
+        self.frames = 0  # Frames recorded since the profiler was created
+        self.generation = 0  # Bumped by reset, so displays know to start over
+
+        # phase -> seconds spent so far in the current frame
+        self.current = dict.fromkeys(self.phases, 0.0)
+
+    def set_enabled(self, enabled):
+        """Switch collection on or off; switching on starts from empty buffers"""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        """Forget all recorded frames"""
+        for values in self.samples.values():
+            values[:] = [0.0] * self.history
+        self.totals[:] = [0.0] * self.history
+        self.index = 0
+        self.count = 0
+        self.generation += 1
+        self.current = dict.fromkeys(self.phases, 0.0)
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        if self.enabled:
+            for phase in self.current:
+                self.current[phase] = 0.0
+
+    def start(self):
+        """Get a start time for a phase (0 while disabled)"""
+        if not self.enabled:
+            return 0
+        return time.perf_counter()
+
+    def stop(self, phase, start):
+        """Add the time since start to a phase"""
+        if self.enabled:
+            self.current[phase] += time.perf_counter() - start
+
+    def lap(self, phase, start):
+        """Add the time since start to a phase and get the start time for the next one"""
+        if not self.enabled:
+            return 0
+        now = time.perf_counter()
+        self.current[phase] += now - start
+        return now
+
+    def end_frame(self):
+        """Store the finished frame in the ring buffers"""
+        if not self.enabled:
+            return
+        index = self.index
+        total = 0.0
+        for phase, seconds in self.current.items():
+            self.samples[phase][index] = seconds
+            total += seconds
+        self.totals[index] = total
+
+        self.index = (index + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+        self.frames += 1
+
+    def get_frame(self, age=0):
+        """Get {phase: seconds} for a recorded frame (age 0 is the latest)"""
+        index = (self.index - 1 - age) % self.history
+        return {phase: values[index] for phase, values in self.samples.items()}
+
+    def get_percentiles(self, values, percentiles=(50, 95, 99)):
+        """Get the given percentiles (in ms) of the recorded part of a ring buffer"""
+        ordered = sorted(values[:self.count] if self.count < self.history else values)
+        if not ordered:
+            return [0.0] * len(percentiles)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(p / 100 * len(ordered)))] * 1000 for p in percentiles]
+
+    def get_stats(self):
+        """Get (phase, p50, p95, p99) rows in ms, with the whole frame as the last row"""
+        rows = [(phase,) + tuple(self.get_percentiles(self.samples[phase])) for phase in self.phases]
+        rows.append(('frame',) + tuple(self.get_percentiles(self.totals)))
+        return rows
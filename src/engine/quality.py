@@ -0,0 +1,121 @@
+# engine/quality.py
+"""
+Quality governor: watches recent frame times and steps optional render costs down when the
+frame budget is blown, and back up once there is headroom again.
+"""
+from constants import (FRAME_BUDGET_MS, QUALITY_GOVERNOR_ENABLED, QUALITY_WINDOW, QUALITY_DOWN_RATIO,
+                       QUALITY_UP_RATIO, QUALITY_UP_WINDOWS, QUALITY_SETTLE_WINDOWS)
+
+# Quality levels from full (0) down; each one gives up a little more than the last
+QUALITY_LEVELS = (
+    {'trail': True, 'pulse': True, 'health_bars': True, 'grid_dots': True,
+     'distant_anim_step': 1, 'smooth_scaling': True},
+    {'trail': True, 'pulse': True, 'health_bars': True, 'grid_dots': True,
+     'distant_anim_step': 2, 'smooth_scaling': True},
+    {'trail': False, 'pulse': False, 'health_bars': True, 'grid_dots': True,
+     'distant_anim_step': 2, 'smooth_scaling': True},
+    {'trail': False, 'pulse': False, 'health_bars': True, 'grid_dots': False,
+     'distant_anim_step': 3, 'smooth_scaling': True},
+    {'trail': False, 'pulse': False, 'health_bars': False, 'grid_dots': False,
+     'distant_anim_step': 4, 'smooth_scaling': True},
+    {'trail': False, 'pulse': False, 'health_bars': False, 'grid_dots': False,
+     'distant_anim_step': 4, 'smooth_scaling': False}
+)
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, window=QUALITY_WINDOW, levels=QUALITY_LEVELS):
+        self.budget_ms = budget_ms
+        self.window = window
+        self.levels = levels
+        self.enabled = QUALITY_GOVERNOR_ENABLED
+
+        self.level = 0
+        self.settings = levels[0]
+
+        # Frame times summed over the current window
+        self.window_ms = 0.0
+        self.window_frames = 0
+
+        # Hysteresis: windows in a row with headroom, and windows left to ignore after a change
+        self.good_windows = 0
+        self.settle_windows = 0
+
+        # (frame, old level, new level, mean frame ms) for every step, for tuning
+        self.frames = 0
+        self.log = []
+
+    def set_enabled(self, enabled):
+        """Switch the governor on or off; switching off restores full quality"""
+        self.enabled = enabled
+        self.reset_window()
+        if not enabled:
+            return self.set_level(0)
+        return False
+
+    def reset_window(self):
+        """Start a new measuring window"""
+        self.window_ms = 0.0
+        self.window_frames = 0
+        self.good_windows = 0
+
+    def record_frame(self, frame_ms):
+        """Add one frame's work time; returns True when the quality level changed"""
+        self.frames += 1
+        if not self.enabled:
+            return False
+
+        self.window_ms += frame_ms
+        self.window_frames += 1
+        if self.window_frames < self.window:
+            return False
+
+        mean_ms = self.window_ms / self.window_frames
+        self.window_ms = 0.0
+        self.window_frames = 0
+
+        # Give the last change time to show up in the frame times before judging it
+        if self.settle_windows:
+            self.settle_windows -= 1
+            return False
+
+        if mean_ms > self.budget_ms * QUALITY_DOWN_RATIO:
+            self.good_windows = 0
+            return self.set_level(self.level + 1, mean_ms)
+
+        if mean_ms < self.budget_ms * QUALITY_UP_RATIO:
+            self.good_windows += 1
+            if self.good_windows >= QUALITY_UP_WINDOWS:
+                return self.set_level(self.level - 1, mean_ms)
+        else:
+            self.good_windows = 0
+        return False
+
+    def set_level(self, level, mean_ms=None):
+        """Switch to a quality level (clamped); returns True when it changed"""
+        level = max(0, min(len(self.levels) - 1, level))
+        if level == self.level:
+            return False
+
+        old_level = self.level
+        self.level = level
+        self.settings = self.levels[level]
+        self.good_windows = 0
+        self.settle_windows = QUALITY_SETTLE_WINDOWS
+
+        self.log.append((self.frames, old_level, level, mean_ms))
+        frame_info = f" (mean {mean_ms:.1f} ms over {self.window} frames)" if mean_ms is not None else ""
+        print(f"Quality: level {old_level} -> {level}{frame_info}: "
+              f"{self.describe_change(self.levels[old_level], self.settings)}")
+        return True
+
+    def describe_change(self, old, new):
+        """Describe which settings differ between two levels"""
+        changes = []
+        for name, value in new.items():
+            if old[name] != value:
+                if isinstance(value, bool):
+                    changes.append(f"{name} {'on' if value else 'off'}")
+                else:
+                    changes.append(f"{name} {old[name]} -> {value}")
+        return ', '.join(changes)
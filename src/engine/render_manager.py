@@ -1,73 +1,345 @@
 # engine/render_manager.py
 """
-Manages the rendering pipeline and draw list preparation.
+The render pipeline: one pass per frame through visibility, collection, ordering, batched
+submission and overlays, with the actual content supplied by pluggable layers.
 """
+import pygame
+from constants import SCREEN_W, SCREEN_H, DIRTY_RECTS_ENABLED
+from engine.render_queue import RenderQueue, LAYER_RESOURCE, LAYER_MONSTER, LAYER_PLAYER
+from engine.dirty_rects import DirtyRectTracker
+from engine.profiler import FrameProfiler
+from entities.monster import Monster
+from entities.resource import Resource
+
+
+class RenderView:
+    """What the camera can see this frame, shared by every stage and layer"""
+    def __init__(self, camera, game_map, rotation, alpha=1.0):
+        self.camera = camera
+        self.game_map = game_map
+        self.rotation = rotation
+        self.zoom = camera.zoom
+        self.alpha = alpha  # How far between the last two simulation ticks to draw moving entities
+
+        # Visible tile range (plus a margin) and the matching screen area
+        # (in view coordinates, i.e. the map as seen at this rotation)
+        self.min_x, self.max_x, self.min_y, self.max_y = \
+            camera.get_visible_tile_bounds(*game_map.get_view_size(rotation))
+        self.margin = camera.get_cull_margin()
+        self.left, self.right = -self.margin, SCREEN_W + self.margin
+        self.top, self.bottom = -self.margin, SCREEN_H + self.margin
+
+        # The same range in world tiles (a rotation keeps it a box), for spatial hash lookups
+        corners = (camera.view_to_world(self.min_x, self.min_y), camera.view_to_world(self.max_x, self.max_y))
+        self.world_min_x, self.world_max_x = sorted(corner[0] for corner in corners)
+        self.world_min_y, self.world_max_y = sorted(corner[1] for corner in corners)
+        self.entities = None
+
+        # Filled by the ordering stage: (type, entity, screen x, screen y) back to front
+        self.sprites = []
+        # Screen rects of the sprites, only worked out in dirty-rect mode
+        self.sprite_rects = []
+
+    def get_entities(self, index):
+        """Get the entities standing in the visible tile range (looked up once per frame)"""
+        if self.entities is None:
+            self.entities = index.query_rect(self.world_min_x, self.world_min_y,
+                                             self.world_max_x, self.world_max_y)
+        return self.entities
+
+    def is_visible(self, x, y):
+        """Check whether a tile is inside the culled view"""
+        return self.camera.is_visible(x, y, self.margin)
+
+    def get_depth(self, x, y):
+        """Get the draw depth of a world tile: x + y of where it lands in the rotated view"""
+        view_x, view_y = self.camera.world_to_view(x, y)
+        return view_x + view_y
+
+
+class RenderLayer:
+    """A source of things to draw; override the stage hooks the layer takes part in"""
+    def collect(self, view, queue):
+        """Collection stage: push depth-sorted sprite records onto the queue"""
+        pass
+
+    def draw_ground(self, view):
+        """Submission stage, before the sprites: queue blits that lie under everything"""
+        pass
+
+    def draw_overlay(self, view, clip=None):
+        """Overlay stage, after the sprites were submitted; skip anything outside clip"""
+        pass
+
+    def get_view_state(self):
+        """Anything that changes this layer's whole look; a change forces a full redraw"""
+        return None
+
+    def track(self, view, tracker):
+        """Report overlay areas to the dirty-rect tracker"""
+        pass
+
+
 class RenderManager:
-    def __init__(self, camera):
+    def __init__(self, camera, renderer, screen, profiler=None):
         self.camera = camera
-        
-    def prepare_draw_list(self, game_map, player, monsters, resources):
-        """Prepare a list of everything to draw with depth information"""
-        draw_list = []
-        
-        # Add tiles first
-        for x in range(game_map.w):
-            for y in range(game_map.h):
-                sx, sy = self.camera.world_to_screen(x, y)
-                # Calculate depth based on isometric position
-                depth = x + y  # Basic isometric depth
-                draw_list.append({
-                    'type': 'tile',
-                    'depth': depth,
-                    'screen_x': sx,
-                    'screen_y': sy,
-                    'map_x': x,
-                    'map_y': y
-                })
-        
-        # Add resources
-        for resource in resources:
-            if not resource.collected:
-                sx, sy = self.camera.world_to_screen(resource.x, resource.y)
-                # Resources should appear on top, so add a small offset to depth
-                depth = resource.x + resource.y + 0.1
-                draw_list.append({
-                    'type': 'resource',
-                    'depth': depth,
-                    'screen_x': sx,
-                    'screen_y': sy,
-                    'entity': resource,
-                    'entity_type': 'resource'
-                })
-        
-        # Add monsters
-        for monster in monsters:
-            sx, sy = self.camera.world_to_screen(monster.x, monster.y)
-            # Monsters should appear on top of resources
-            depth = monster.x + monster.y + 0.2
-            draw_list.append({
-                'type': 'monster',
-                'depth': depth,
-                'screen_x': sx,
-                'screen_y': sy,
-                'entity': monster,
-                'entity_type': 'monster'
-            })
-        
-        # Add player (always on top)
-        sx, sy = self.camera.world_to_screen(player.x, player.y)
-        depth = player.x + player.y + 0.3
-        draw_list.append({
-            'type': 'player',
-            'depth': depth,
-            'screen_x': sx,
-            'screen_y': sy,
-            'entity': player,
-            'entity_type': 'player'
-        })
-        
-        return draw_list
-    
-    def sort_draw_list(self, draw_list):
-        """Sort draw list by depth"""
-        return sorted(draw_list, key=lambda item: (item['depth'], item.get('entity_type', '')))
\ No newline at end of file
+        self.renderer = renderer
+        self.screen = screen
+        self.profiler = profiler or FrameProfiler()
+        self.render_queue = RenderQueue()
+        self.layers = []
+
+        # Dirty-rect presentation (F2)
+        self.dirty_tracker = DirtyRectTracker()
+        self.dirty_rects = DIRTY_RECTS_ENABLED
+
+        # What present() should show: None for the whole screen, else the redrawn rects
+        self.pending_rects = None
+
+    def add_layer(self, layer):
+        """Add a layer; layers run in the order they were added"""
+        self.layers.append(layer)
+        return layer
+
+    def set_dirty_rects(self, enabled):
+        """Switch dirty-rect presentation on or off"""
+        self.dirty_rects = enabled
+        self.dirty_tracker.invalidate()
+
+    def render(self, game_map, rotation, alpha=1.0):
+        """Run every stage for one frame (call present() to show it)"""
+        profiler = self.profiler
+        start = profiler.start()
+        self.renderer.begin_frame()
+        self.renderer.rotation = rotation
+
+        view = self.build_view(game_map, rotation, alpha)
+        self.collect(view)
+        self.order(view)
+
+        # In dirty-rect mode only the parts of the screen that changed are redrawn
+        dirty = None
+        if self.dirty_rects:
+            dirty = self.collect_dirty_rects(view)
+        profiler.stop('render.collect', start)
+
+        if dirty is None:
+            self.draw_frame(view)
+        elif dirty:
+            for rect in dirty:
+                self.screen.set_clip(rect)
+                self.draw_frame(view, rect)
+            self.screen.set_clip(None)
+        self.pending_rects = dirty
+        return view
+
+    def present(self):
+        """Show the rendered frame: the whole screen, or just the redrawn rects"""
+        if self.pending_rects is None:
+            pygame.display.flip()
+        elif self.pending_rects:
+            pygame.display.update(self.pending_rects)
+
+    def build_view(self, game_map, rotation, alpha=1.0):
+        """Visibility stage: work out what the camera can see"""
+        return RenderView(self.camera, game_map, rotation, alpha)
+
+    def collect(self, view):
+        """Collection stage: let every layer queue its visible sprites"""
+        # Depth is x + y in view coordinates (basic isometric depth); the layer orders entities on the same tile
+        self.render_queue.begin(view.min_x + view.min_y, view.max_x + view.max_y)
+        for layer in self.layers:
+            layer.collect(view, self.render_queue)
+
+    def order(self, view):
+        """Ordering stage: read the sprites back in depth order"""
+        view.sprites = list(self.render_queue)
+
+    def draw_frame(self, view, clip=None):
+        """Submission and overlay stages, skipping anything outside clip when one is given"""
+        renderer = self.renderer
+        profiler = self.profiler
+        zoom = view.zoom
+        start = profiler.start()
+        renderer.clear()
+
+        for layer in self.layers:
+            layer.draw_ground(view)
+
+        # Draw everything back to front; the queue is already in depth order
+        for i, (entity_type, entity, sx, sy) in enumerate(view.sprites):
+            if clip is None or clip.colliderect(view.sprite_rects[i]):
+                renderer.draw_entity(entity, sx, sy, entity_type, zoom)
+
+        # Submit the batched ground and sprite blits before the overlays
+        renderer.flush()
+        start = profiler.lap('render.world', start)
+
+        for layer in self.layers:
+            layer.draw_overlay(view, clip)
+        profiler.stop('render.overlay', start)
+
+    def collect_dirty_rects(self, view):
+        """Work out which screen areas changed; returns None when everything must be redrawn"""
+        renderer = self.renderer
+        zoom = view.zoom
+        tracker = self.dirty_tracker
+
+        # Camera movement, zoom, rotation and full-screen layer changes repaint everything
+        view_state = (self.camera.x, self.camera.y, zoom, view.rotation, renderer.sprite_offset)
+        tracker.begin_frame(view_state + tuple(layer.get_view_state() for layer in self.layers))
+
+        view.sprite_rects = []
+        for entity_type, entity, sx, sy in view.sprites:
+            rect = renderer.get_entity_rect(entity, sx, sy, entity_type, zoom)
+            view.sprite_rects.append(rect)
+            pulse = 0
+            if entity_type == 'player' and entity.current_anim == 'idle':
+                pulse = renderer.get_pulse_size(zoom)
+            tracker.track(id(entity), rect, (entity.get_current_frame(view.rotation), entity.current_anim,
+                                             entity.hp, pulse))
+
+        for layer in self.layers:
+            layer.track(view, tracker)
+
+        return tracker.end_frame()
+
+
+class ItemLayer(RenderLayer):
+    """Uncollected resources lying on the map"""
+    def __init__(self, index):
+        self.index = index
+
+    def collect(self, view, queue):
+        camera = view.camera
+        # Only what the spatial hash has inside the view is tested, however big the map is
+        for resource in view.get_entities(self.index):
+            if (isinstance(resource, Resource) and not resource.collected
+                    and view.is_visible(resource.x, resource.y)):
+                sx, sy = camera.world_to_screen(resource.x, resource.y)
+                queue.push(view.get_depth(resource.x, resource.y), LAYER_RESOURCE, ('resource', resource, sx, sy))
+
+
+class ActorLayer(RenderLayer):
+    """Monsters and the player (the player is never culled and goes on top of its tile)"""
+    def __init__(self, player, index):
+        self.player = player
+        self.index = index
+
+    def collect(self, view, queue):
+        camera = view.camera
+        for monster in view.get_entities(self.index):
+            if not isinstance(monster, Monster) or not view.is_visible(monster.x, monster.y):
+                continue
+            # Sorted by tile, drawn at the interpolated position
+            sx, sy = camera.world_to_screen(*monster.get_render_position(view.alpha))
+            queue.push(view.get_depth(monster.x, monster.y), LAYER_MONSTER, ('monster', monster, sx, sy))
+
+        player = self.player
+        sx, sy = camera.world_to_screen(*player.get_render_position(view.alpha))
+        queue.push(view.get_depth(player.x, player.y), LAYER_PLAYER, ('player', player, sx, sy))
+
+
+class GridDotLayer(RenderLayer):
+    """Debug grid dots at the visible tile centers"""
+    def __init__(self, game):
+        self.game = game
+
+        # Visible tile centers, reused while the view hasn't moved
+        self.tile_points = []
+        self.tile_points_key = None
+
+    def is_shown(self):
+        """Check whether the dots are on: debug mode, unless the quality governor dropped them"""
+        return self.game.show_debug and self.game.quality.settings['grid_dots']
+
+    def collect(self, view, queue):
+        if not self.is_shown():
+            return
+
+        camera = view.camera
+        view_key = (camera.x, camera.y, view.zoom, view.rotation)
+        if view_key == self.tile_points_key:
+            return
+
+        tile_points = []
+        left, right, top, bottom = view.left, view.right, view.top, view.bottom
+        for x in range(view.min_x, view.max_x + 1):
+            for y in range(view.min_y, view.max_y + 1):
+                sx, sy = camera.view_to_screen(x, y)
+                # The bounds are a box in world space, so trim the corners that fall off screen
+                if left <= sx <= right and top <= sy <= bottom:
+                    tile_points.append((sx, sy))
+        self.tile_points = tile_points
+        self.tile_points_key = view_key
+
+    def draw_overlay(self, view, clip=None):
+        show_debug = self.is_shown()
+        tile_points = self.tile_points
+        if clip is not None and show_debug:
+            dot_area = clip.inflate(int(8 * view.zoom) + 2, int(8 * view.zoom) + 2)
+            tile_points = [point for point in tile_points if dot_area.collidepoint(point)]
+        self.game.debug_panel.draw_grid_dots(tile_points, view.zoom, show_debug)
+
+    def get_view_state(self):
+        return self.is_shown()
+
+
+class UILayer(RenderLayer):
+    """HUD, debug panel and the inventory/hotbar, drawn on top of the world"""
+    def __init__(self, game):
+        self.game = game
+        self.resources_left = 0
+
+        # Screen areas the open inventory covers this frame (its panel, then the dragged item or tooltip)
+        self.inventory_areas = []
+
+    def collect(self, view, queue):
+        # Gathering takes a resource out of the list, so its length is the count left
+        self.resources_left = len(self.game.resources)
+
+    def draw_overlay(self, view, clip=None):
+        game = self.game
+        zoom = view.zoom
+
+        # Draw HUD and UI with sprite offset info
+        if clip is None or clip.colliderect(game.hud.rect):
+            game.hud.draw_hud(game.player, self.resources_left, view.rotation, zoom, game.sprite_offset)
+
+        if game.show_debug and (clip is None or clip.colliderect(game.debug_panel.rect)):
+            game.debug_panel.draw_debug_info(game.sprite_status, game.all_loaded_files, game.clock, game.player,
+                                             zoom, game.show_debug, game.renderer.scale_cache.get_stats(),
+                                             game.quality.level)
+
+        if game.show_debug and (clip is None or clip.colliderect(game.debug_panel.profiler_rect)):
+            game.debug_panel.draw_profiler(game.profiler, game.show_debug)
+
+        # Draw UI (on top of everything else)
+        if (clip is None or clip.colliderect(game.ui_manager.get_hotbar_rect())
+                or clip.collidelist(self.inventory_areas) != -1):
+            game.ui_manager.draw(game.inventory)
+
+    def get_view_state(self):
+        return self.game.show_debug, self.game.ui_manager.inventory_visible
+
+    def track(self, view, tracker):
+        game = self.game
+        tracker.track('hud', game.hud.rect,
+                      game.hud.get_state(game.player, self.resources_left, view.rotation, view.zoom,
+                                         game.sprite_offset))
+        if game.show_debug:
+            # FPS and counters change nearly every frame
+            tracker.track('debug', game.debug_panel.rect)
+            tracker.track('profiler', game.debug_panel.profiler_rect)
+        ui_manager = game.ui_manager
+        tracker.track('hotbar', ui_manager.get_hotbar_rect(), ui_manager.get_hotbar_state(game.inventory))
+
+        self.inventory_areas = []
+        if ui_manager.inventory_visible:
+            state = ui_manager.get_inventory_state(game.inventory)
+            self.inventory_areas.append(ui_manager.inventory_rect)
+            tracker.track('inventory', ui_manager.inventory_rect, state)
+            cursor_rect = ui_manager.get_inventory_cursor_rect(game.inventory)
+            if cursor_rect is not None:
+                self.inventory_areas.append(cursor_rect)
+                tracker.track('inventory_cursor', cursor_rect, state)
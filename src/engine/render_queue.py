@@ -0,0 +1,67 @@
+# engine/render_queue.py
+"""
+Depth-bucketed draw queue for isometric sprites.
+
+Depth is the integer x + y of an entity's tile, so records are dropped into one bucket per
+(depth, layer) and read back in order without sorting.
+"""
+
+# Draw order of entity types that share a tile
+LAYER_RESOURCE = 0
+LAYER_MONSTER = 1
+LAYER_PLAYER = 2
+LAYER_COUNT = 3
+
+
+class RenderQueue:
+    def __init__(self, layer_count=LAYER_COUNT):
+        self.layer_count = layer_count
+
+        # Buckets are kept between frames so steady-state frames don't allocate lists
+        self.buckets = []
+        self.size = 0
+        self.min_depth = 0
+        self.count = 0
+
+    def begin(self, min_depth, max_depth):
+        """Start a new frame covering depths min_depth..max_depth"""
+        # Drop anything left over from a frame that wasn't fully drawn
+        if self.count:
+            for bucket in self.buckets[:self.size]:
+                bucket.clear()
+
+        self.min_depth = min_depth
+        self.size = max(0, max_depth - min_depth + 1) * self.layer_count
+        while len(self.buckets) < self.size:
+            self.buckets.append([])
+        self.count = 0
+
+    def push(self, depth, layer, record):
+        """Queue a record at an integer depth and layer"""
+        index = (depth - self.min_depth) * self.layer_count + layer
+        # Culling keeps entities inside the range, but clamp in case a caller strays outside it
+        if index < 0:
+            index = layer
+        if index >= self.size:
+            self.grow(index)
+        self.buckets[index].append(record)
+        self.count += 1
+
+    def grow(self, index):
+        """Extend the depth range so index is a valid bucket"""
+        self.size = (index // self.layer_count + 1) * self.layer_count
+        while len(self.buckets) < self.size:
+            self.buckets.append([])
+
+    def __iter__(self):
+        """Yield records back to front and empty the queue"""
+        buckets = self.buckets
+        for index in range(self.size):
+            bucket = buckets[index]
+            if bucket:
+                yield from bucket
+                bucket.clear()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
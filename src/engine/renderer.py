@@ -3,56 +3,80 @@ import pygame
 from ui.ui import UI
 from constants import *
 from ui.hud import HUD
+from engine.surface_cache import ScaledSurfaceCache
+from utils.loader import make_trail_frames
 
 class Renderer:
     def __init__(self, screen):
         self.screen = screen
         self.ui = UI(screen)
         self.sprite_offset = SPRITE_VERTICAL_OFFSET  # Load from constants
+        self.rotation = 0  # View rotation, so sprites face the way they move on screen
+        self.scale_cache = ScaledSurfaceCache()
+        self.frame_ticks = 0
+
+        # Optional effects, switched off by the quality governor under load
+        self.show_trail = True
+        self.show_pulse = True
+        self.show_health_bars = True
+
+        # Walk frame -> faded trail copies; zoomed copies come from the scale cache
+        self.trail_frames = {}
+
+        # Blits are collected here and submitted in one call (fblits on pygame-ce)
+        self.blit_batch = []
+        self.use_fblits = hasattr(screen, 'fblits')
+
+    def apply_quality(self, settings):
+        """Use the effect and scaling settings of a quality level (returns True if the scaling changed)"""
+        self.show_trail = settings['trail']
+        self.show_pulse = settings['pulse']
+        self.show_health_bars = settings['health_bars']
+        return self.scale_cache.set_smooth(settings['smooth_scaling'])
+
+    def begin_frame(self):
+        """Latch the time used by animated effects so the whole frame agrees on it"""
+        self.frame_ticks = pygame.time.get_ticks()
 
     def clear(self):
         """Clear the screen"""
+        self.blit_batch.clear()  # Anything queued would be painted over anyway
         self.ui.clear_screen()
 
-    def draw_tile(self, tile_img, screen_x, screen_y, zoom=1.0):
-        """Draw a tile at screen coordinates with zoom - EXACTLY CENTERED"""
-        # Scale the tile image if zoom is not 1.0
-        if abs(zoom - 1.0) > 0.01:
-            # Get the scaled dimensions
-            original_width, original_height = tile_img.get_size()
-            scaled_width = int(original_width * zoom)
-            scaled_height = int(original_height * zoom)
-
-            # Scale the image
-            scaled_img = pygame.transform.scale(tile_img, (scaled_width, scaled_height))
-
-            # Draw EXACTLY centered at screen_x, screen_y
-            self.screen.blit(scaled_img,
-                             (screen_x - scaled_width // 2,
-                              screen_y - scaled_height // 2))
-        else:
-            # Draw at original size
-            original_width, original_height = tile_img.get_size()
-            self.screen.blit(tile_img,
-                             (screen_x - original_width // 2,
-                              screen_y - original_height // 2))
+    def queue_blit(self, surface, dest):
+        """Queue a blit for the next flush"""
+        self.blit_batch.append((surface, dest))
 
-    def draw_entity(self, entity, screen_x, screen_y, entity_type='entity', zoom=1.0):
-        """Draw an entity at screen coordinates with zoom - WITH ADJUSTABLE OFFSET"""
-        frame = entity.get_current_frame()
-        if not frame:
+    def flush(self):
+        """Submit all queued blits in a single call"""
+        if not self.blit_batch:
             return
+        if self.use_fblits:
+            self.screen.fblits(self.blit_batch)
+        else:
+            self.screen.blits(self.blit_batch, doreturn=False)
+        self.blit_batch.clear()
 
-        # Scale the frame if needed
+    def get_scaled(self, img, zoom=1.0):
+        """Get an image scaled for the zoom level (scaled once per zoom level)"""
         if abs(zoom - 1.0) > 0.01:
-            original_width, original_height = frame.get_size()
-            scaled_width = int(original_width * zoom)
-            scaled_height = int(original_height * zoom)
-            frame = pygame.transform.scale(frame, (scaled_width, scaled_height))
-
-        # Get current frame dimensions (might be scaled)
-        frame_width, frame_height = frame.get_width(), frame.get_height()
-
+            return self.scale_cache.get(img, zoom)
+        return img
+
+    def add_trail_frames(self, trail_frames):
+        """Register pre-rendered walking trail copies (see utils.loader.build_trail_frames)"""
+        self.trail_frames.update(trail_frames)
+
+    def get_trail_frames(self, frame):
+        """Get the walking trail copies of an unscaled frame, creating them once if missing"""
+        trail_frames = self.trail_frames.get(frame)
+        if trail_frames is None:
+            trail_frames = make_trail_frames(frame)
+            self.trail_frames[frame] = trail_frames
+        return trail_frames
+
+    def get_vertical_offset(self, frame_height, entity_type, zoom=1.0):
+        """Get how far a sprite is raised above its tile center"""
         # Base vertical offset to position sprite between dots
         base_offset = -frame_height // 2  # Move sprite up by half its height
 
@@ -69,38 +93,85 @@ class Renderer:
         else:
             entity_adjustment = 0
 
+        return base_offset + adjustable_offset + entity_adjustment
+
+    def get_pulse_size(self, zoom=1.0):
+        """Get the current radius of the idle player pulse"""
+        return (3 + int(2 * pygame.math.Vector2(1, 0).rotate(self.frame_ticks / 50).y)) * zoom
+
+    def get_entity_rect(self, entity, screen_x, screen_y, entity_type='entity', zoom=1.0):
+        """Get a screen rect covering everything draw_entity paints for an entity"""
+        frame = entity.get_current_frame(self.rotation)
+        if not frame:
+            return pygame.Rect(screen_x, screen_y, 0, 0)
+
+        frame = self.get_scaled(frame, zoom)
+        frame_width, frame_height = frame.get_size()
+        sprite_top = screen_y - frame_height // 2 + self.get_vertical_offset(frame_height, entity_type, zoom)
+        rect = pygame.Rect(screen_x - frame_width // 2, int(sprite_top), frame_width, frame_height)
+
+        if entity_type == 'player':
+            # Walking trail copies are shifted left and down by 2 * zoom per copy
+            trail_offset = int(2 * zoom * (len(TRAIL_ALPHAS) - 1)) + 1
+            rect.union_ip(rect.move(-trail_offset, trail_offset))
+            # Idle pulse around the tile center
+            pulse_radius = int(5 * zoom) + 1
+            rect.union_ip(pygame.Rect(screen_x - pulse_radius, screen_y - pulse_radius,
+                                      pulse_radius * 2 + 1, pulse_radius * 2 + 1))
+        elif entity_type == 'monster':
+            # Health bar (with its shadow) above the sprite
+            bar_width = int(30 * zoom) + 2
+            bar_height = max(2, int(4 * zoom)) + 2
+            rect.union_ip(pygame.Rect(screen_x - bar_width // 2 - 1, int(sprite_top - frame_height - 5 * zoom) - 1,
+                                      bar_width + 1, bar_height))
+
+        # Allow for rounding of fractional offsets
+        return rect.inflate(2, 2)
+
+    def draw_entity(self, entity, screen_x, screen_y, entity_type='entity', zoom=1.0):
+        """Draw an entity at screen coordinates with zoom - WITH ADJUSTABLE OFFSET"""
+        source_frame = entity.get_current_frame(self.rotation)
+        if not source_frame:
+            return
+
+        # Scale the frame if needed
+        frame = self.get_scaled(source_frame, zoom)
+
+        # Get current frame dimensions (might be scaled)
+        frame_width, frame_height = frame.get_width(), frame.get_height()
+
         # Total vertical offset
-        vertical_offset = base_offset + adjustable_offset + entity_adjustment
+        vertical_offset = self.get_vertical_offset(frame_height, entity_type, zoom)
 
         # Visual effects for player (scaled with zoom)
         if entity_type == 'player':
-            if entity.current_anim == 'idle':
-                pulse_size = (3 + int(2 * pygame.math.Vector2(1, 0).rotate(pygame.time.get_ticks() / 50).y)) * zoom
+            if entity.current_anim == 'idle' and self.show_pulse:
+                pulse_size = self.get_pulse_size(zoom)
                 # Position pulse effect at the sprite's feet (tile center)
+                self.flush()  # Keep the pulse above sprites queued before this one
                 pygame.draw.circle(self.screen, (100, 255, 100, 80),
                                    (screen_x, screen_y), int(pulse_size))
-            elif entity.current_anim == 'walk':
-                for i in range(2):
-                    alpha = 150 - i * 75
+            elif entity.current_anim == 'walk' and self.show_trail:
+                # Faded copies are made once per frame and zoom level, not every draw
+                for i, trail_frame in enumerate(self.get_trail_frames(source_frame)):
                     offset = i * 2 * zoom
-                    trail_frame = frame.copy()
-                    trail_frame.set_alpha(alpha)
-                    self.screen.blit(trail_frame,
-                                     (screen_x - frame_width // 2 - offset,
-                                      screen_y - frame_height // 2 + vertical_offset + offset))
+                    self.queue_blit(self.get_scaled(trail_frame, zoom),
+                                    (screen_x - frame_width // 2 - offset,
+                                     screen_y - frame_height // 2 + vertical_offset + offset))
 
         # Draw health bar for monsters with low HP
-        if entity_type == 'monster' and entity.hp < 8:
+        if entity_type == 'monster' and entity.hp < 8 and self.show_health_bars:
             # Position health bar above the entity
             bar_y_offset = -frame_height - 5 * zoom
+            self.flush()  # Keep the bar above sprites queued before this one
             self.ui.draw_health_bar(entity, screen_x,
                                     screen_y - frame_height // 2 + vertical_offset + bar_y_offset,
                                     frame_height, entity.hp, 8, zoom)
 
         # Draw the entity with adjustable offset
-        self.screen.blit(frame,
-                         (screen_x - frame_width // 2,
-                          screen_y - frame_height // 2 + vertical_offset))
+        self.queue_blit(frame,
+                        (screen_x - frame_width // 2,
+                         screen_y - frame_height // 2 + vertical_offset))
 
     # ... rest of the methods remain the same ...
 
@@ -0,0 +1,368 @@
+# engine/save_game.py
+"""
+Saved games: a versioned binary snapshot of the player, monsters, resources, inventory and the
+changed parts of the map, plus an autosaver that writes snapshots on a worker thread.
+
+Layout (little-endian):
+    header     magic 'IRSV', version u16, chunk size u16, map w u32, map h u32, seed u64,
+               rotation u8, pad u8, monster count u32, resource count u32, chunk count u32
+    player     x i32, y i32, hp i32, resources carried i32, facing u8
+    monsters   count * (x i32, y i32, hp i16, facing u8)
+    resources  count * (x i32, y i32)
+    inventory  slot count u16, item type count u16, item types (length u8 + UTF-8 name each),
+               slots * (item type index i16 or -1 when empty, count u32)
+    chunks     count * (cx i32, cy i32), then count * chunk size² tile codes ([x, y] order)
+
+Unchanged terrain is not saved: it comes back from the seed. Entity columns are read straight
+into NumPy arrays, so loading costs about one object creation per entity.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+from operator import attrgetter
+import numpy as np
+from constants import TILE_TYPES
+from entities.monster import Monster
+from entities.resource import Resource
+
+MAGIC = b'IRSV'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQBBIII')
+PLAYER = struct.Struct('<iiiiB')
+INVENTORY_HEADER = struct.Struct('<HH')
+NAME_LENGTH = struct.Struct('<B')
+
+MONSTER_DTYPE = np.dtype([('x', '<i4'), ('y', '<i4'), ('hp', '<i2'), ('facing', 'u1')])
+RESOURCE_DTYPE = np.dtype([('x', '<i4'), ('y', '<i4')])
+SLOT_DTYPE = np.dtype([('item', '<i2'), ('count', '<u4')])
+CHUNK_KEY_DTYPE = np.dtype([('cx', '<i4'), ('cy', '<i4')])
+
+# Facing name <-> one-byte code
+FACINGS = ('north', 'east', 'south', 'west')
+FACING_CODES = {facing: code for code, facing in enumerate(FACINGS)}
+
+
+class GameSnapshot:
+    """Everything a save holds, taken from the game in one go on the main thread"""
+    def __init__(self, w, h, seed, chunk_size, rotation, player, monsters, resources, slots, chunks,
+                 shared_chunks=None):
+        self.w = w
+        self.h = h
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.rotation = rotation
+        self.player = player  # (x, y, hp, resources carried, facing code)
+        self.monsters = monsters  # MONSTER_DTYPE array, or (x, y, hp, facing name) tuples until written
+        self.resources = resources  # RESOURCE_DTYPE array, or a list of its tuples until written
+        self.slots = slots  # Inventory slots: None or (item type, count)
+        self.chunks = chunks  # (cx, cy) -> tile codes of every changed chunk
+        self.shared_chunks = shared_chunks  # Cleared once written, so the map stops copying on write
+
+    def release(self):
+        """Tell the map its chunk arrays are no longer needed by this snapshot"""
+        if self.shared_chunks is not None:
+            self.shared_chunks.clear()
+
+
+def capture_game(game):
+    """Take a snapshot of the game: entity fields are copied, changed chunks are shared copy-on-write
+
+    Raises ValueError if the game doesn't fit the save format, so the worker never starts on it.
+    """
+    game_map = game.game_map
+    player = game.player
+    player_fields = (player.x, player.y, player.hp, player.inv.get('resource', 0),
+                     FACING_CODES.get(player.facing, 2))
+    slots = [(slot['type'], slot['count']) if slot else None for slot in game.inventory.slots]
+    check_fields(game_map, game.rotation, player_fields, slots, len(game.monsters), len(game.resources))
+
+    chunks, shared_chunks = game_map.share_modified_chunks()
+    return GameSnapshot(
+        game_map.w, game_map.h, game_map.seed, game_map.chunk_size, game.rotation, player_fields,
+        # One C-level attribute pass per list: the frame loop pays well under a microsecond an entity
+        list(map(attrgetter('x', 'y', 'hp', 'facing'), game.monsters)),
+        list(map(attrgetter('x', 'y'), game.resources)),
+        slots, chunks, shared_chunks
+    )
+
+
+def check_fields(game_map, rotation, player_fields, slots, monster_count, resource_count):
+    """Check the header, player and inventory values against the sizes of their fields"""
+    if not 0 <= game_map.seed < 2 ** 64:
+        raise ValueError(f"seed {game_map.seed} doesn't fit in 64 bits")
+    if not (0 < game_map.w < 2 ** 31 and 0 < game_map.h < 2 ** 31 and 0 < game_map.chunk_size < 2 ** 16):
+        raise ValueError(f"map {game_map.w}x{game_map.h} (chunks of {game_map.chunk_size}) is too big to save")
+    if not 0 <= rotation < 4:
+        raise ValueError(f"rotation {rotation} is not a quarter turn count")
+    if monster_count >= 2 ** 32 or resource_count >= 2 ** 32:
+        raise ValueError("too many entities to save")
+    if not all(-2 ** 31 <= value < 2 ** 31 for value in player_fields[:4]):
+        raise ValueError(f"player values {player_fields[:4]} don't fit in 32 bits")
+
+    if len(slots) >= 2 ** 16:
+        raise ValueError(f"{len(slots)} inventory slots are too many to save")
+    for slot in slots:
+        if slot is None:
+            continue
+        item_type, count = slot
+        if len(item_type.encode('utf-8')) > 255:
+            raise ValueError(f"item type name {item_type[:20]!r}... is longer than 255 bytes")
+        if not 0 <= count < 2 ** 32:
+            raise ValueError(f"item count {count} doesn't fit in 32 bits")
+
+
+def write_snapshot(snapshot, path):
+    """Write a snapshot to a save file, replacing the old one only once the new one is complete"""
+    monsters = np.array([(x, y, hp, FACING_CODES.get(facing, 2)) for x, y, hp, facing in snapshot.monsters],
+                        dtype=MONSTER_DTYPE)
+    resources = np.array(snapshot.resources, dtype=RESOURCE_DTYPE)
+
+    item_types = sorted({slot[0] for slot in snapshot.slots if slot})
+    item_codes = {item_type: code for code, item_type in enumerate(item_types)}
+    slots = np.array([(item_codes[slot[0]], slot[1]) if slot else (-1, 0) for slot in snapshot.slots],
+                     dtype=SLOT_DTYPE)
+
+    keys = sorted(snapshot.chunks)
+    chunk_keys = np.array(keys, dtype=CHUNK_KEY_DTYPE)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    try:
+        write_file(temp_path, snapshot, monsters, resources, item_types, slots, keys, chunk_keys)
+    except BaseException:
+        # Never leave a half-written file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+
+
+def write_file(temp_path, snapshot, monsters, resources, item_types, slots, keys, chunk_keys):
+    """Write the sections of a save file, in order"""
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, snapshot.chunk_size, snapshot.w, snapshot.h, snapshot.seed,
+                               snapshot.rotation, 0, len(monsters), len(resources), len(keys)))
+        file.write(PLAYER.pack(*snapshot.player))
+        file.write(monsters.tobytes())
+        file.write(resources.tobytes())
+
+        file.write(INVENTORY_HEADER.pack(len(slots), len(item_types)))
+        for item_type in item_types:
+            name = item_type.encode('utf-8')
+            file.write(NAME_LENGTH.pack(len(name)))
+            file.write(name)
+        file.write(slots.tobytes())
+
+        file.write(chunk_keys.tobytes())
+        for key in keys:
+            file.write(np.ascontiguousarray(snapshot.chunks[key], dtype=np.uint8).tobytes())
+
+
+def read_snapshot(path):
+    """Read a save file into a snapshot (raises ValueError if it isn't a save this version can read)
+
+    Everything is checked here, so restore_game can't fail halfway through replacing the game.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    try:
+        return parse_snapshot(data, path)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"{path} is damaged ({e})") from e
+
+
+def require(data, offset, size, path, section):
+    """Check that a section of the given size is all there"""
+    if offset + size > len(data):
+        raise ValueError(f"{path} is damaged (cut short in the {section})")
+
+
+def parse_snapshot(data, path):
+    """Check and unpack the sections of a save file"""
+    if len(data) < HEADER.size or data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a saved game")
+    magic, version, chunk_size, w, h, seed, rotation, _, monster_count, resource_count, chunk_count = \
+        HEADER.unpack_from(data, 0)
+    if version > VERSION:
+        raise ValueError(f"{path} is save version {version}, newer than this game ({VERSION})")
+    if not (w and h and chunk_size and chunk_size & (chunk_size - 1) == 0 and rotation < 4):
+        raise ValueError(f"{path} is damaged (bad header)")
+    offset = HEADER.size
+
+    require(data, offset, PLAYER.size, path, 'player')
+    player = PLAYER.unpack_from(data, offset)
+    if player[4] >= len(FACINGS):
+        raise ValueError(f"{path} is damaged (bad player facing)")
+    offset += PLAYER.size
+
+    require(data, offset, monster_count * MONSTER_DTYPE.itemsize, path, 'monsters')
+    monsters = np.frombuffer(data, dtype=MONSTER_DTYPE, count=monster_count, offset=offset)
+    if monster_count and monsters['facing'].max() >= len(FACINGS):
+        raise ValueError(f"{path} is damaged (bad monster facing)")
+    offset += monsters.nbytes
+    require(data, offset, resource_count * RESOURCE_DTYPE.itemsize, path, 'resources')
+    resources = np.frombuffer(data, dtype=RESOURCE_DTYPE, count=resource_count, offset=offset)
+    offset += resources.nbytes
+
+    require(data, offset, INVENTORY_HEADER.size, path, 'inventory')
+    slot_count, item_type_count = INVENTORY_HEADER.unpack_from(data, offset)
+    offset += INVENTORY_HEADER.size
+    item_types = []
+    for _ in range(item_type_count):
+        require(data, offset, NAME_LENGTH.size, path, 'item types')
+        length, = NAME_LENGTH.unpack_from(data, offset)
+        offset += NAME_LENGTH.size
+        require(data, offset, length, path, 'item types')
+        item_types.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+    require(data, offset, slot_count * SLOT_DTYPE.itemsize, path, 'inventory')
+    slot_records = np.frombuffer(data, dtype=SLOT_DTYPE, count=slot_count, offset=offset)
+    offset += slot_records.nbytes
+    if slot_count and not (-1 <= slot_records['item'].min() and slot_records['item'].max() < item_type_count):
+        raise ValueError(f"{path} is damaged (bad inventory item)")
+    slots = [(item_types[item], count) if item >= 0 else None for item, count in slot_records.tolist()]
+
+    require(data, offset, chunk_count * (CHUNK_KEY_DTYPE.itemsize + chunk_size * chunk_size), path, 'map')
+    chunk_keys = np.frombuffer(data, dtype=CHUNK_KEY_DTYPE, count=chunk_count, offset=offset)
+    chunks_x = (w + chunk_size - 1) // chunk_size
+    chunks_y = (h + chunk_size - 1) // chunk_size
+    if chunk_count and not (chunk_keys['cx'].min() >= 0 and chunk_keys['cx'].max() < chunks_x and
+                            chunk_keys['cy'].min() >= 0 and chunk_keys['cy'].max() < chunks_y):
+        raise ValueError(f"{path} is damaged (map chunk outside the map)")
+    offset += chunk_keys.nbytes
+    tiles = np.frombuffer(data, dtype=np.uint8, count=chunk_count * chunk_size * chunk_size, offset=offset)
+    tiles = tiles.reshape(chunk_count, chunk_size, chunk_size).copy()  # Writable: the map edits them in place
+    if chunk_count and tiles.max() >= len(TILE_TYPES):
+        raise ValueError(f"{path} is damaged (unknown tile code)")
+    chunks = {key: tiles[i] for i, key in enumerate(chunk_keys.tolist())}
+
+    if not (0 <= player[0] < w and 0 <= player[1] < h):
+        raise ValueError(f"{path} is damaged (player outside the map)")
+    for entities in (monsters, resources):
+        if len(entities) and not (entities['x'].min() >= 0 and entities['x'].max() < w and
+                                  entities['y'].min() >= 0 and entities['y'].max() < h):
+            raise ValueError(f"{path} is damaged (entity outside the map)")
+
+    return GameSnapshot(w, h, seed, chunk_size, rotation, player, monsters, resources, slots, chunks)
+
+
+def restore_game(game, snapshot):
+    """Put a loaded snapshot (checked by read_snapshot) into a running game, replacing its world"""
+    # Build everything new first, then swap it in
+    entity_manager = game.entity_manager
+    monster_animations = entity_manager.monster_animations
+    monsters = []
+    for x, y, hp, facing in snapshot.monsters.tolist():
+        monster = Monster(x, y, monster_animations)
+        monster.hp = hp
+        monster.facing = FACINGS[facing]
+        monsters.append(monster)
+    resource_sprite = entity_manager.resource_sprite
+    resources = [Resource(x, y, resource_sprite) for x, y in snapshot.resources.tolist()]
+
+    game.game_map.reset(snapshot.w, snapshot.h, snapshot.seed, snapshot.chunk_size, snapshot.chunks)
+    game.terrain_layer.invalidate_all()
+
+    # Entity lists are replaced in place: the layers and managers hold on to them
+    game.monsters[:] = monsters
+    game.resources[:] = resources
+
+    player = game.player
+    player.x, player.y, player.hp, player.inv['resource'], facing = snapshot.player
+    player.facing = FACINGS[facing]
+    player.is_moving = False
+    entity_manager.rebuild_index()
+    entity_manager.begin_tick()
+
+    # A save from a game with a different inventory size keeps the slots that still exist
+    slot_count = len(game.inventory.slots)
+    slots = [{'type': slot[0], 'count': slot[1]} if slot else None for slot in snapshot.slots[:slot_count]]
+    game.inventory.slots[:] = slots + [None] * (slot_count - len(slots))
+    game.inventory.mark_changed()
+
+    game.rotation = game.world_rotator.rotation = snapshot.rotation
+    game.camera.set_map_size(snapshot.w, snapshot.h)
+    game.camera.set_rotation(snapshot.rotation)
+    game.camera.center_on(player.x, player.y)
+    game.game_map.set_focus(player.x, player.y)
+
+
+class Autosaver:
+    def __init__(self, path, interval_ms):
+        self.path = path
+        self.interval_ms = interval_ms  # 0 turns autosave off (saves can still be requested)
+        self.timer = 0
+
+        # One worker thread writes snapshots; at most one is in flight, later requests are skipped
+        self.requests = queue.Queue(maxsize=1)
+        self.idle = threading.Event()  # Set while no save is in flight
+        self.idle.set()
+        self.worker = None
+        self.start_worker()
+
+        # Counters for profiling
+        self.saves = 0
+        self.skipped = 0
+        self.last_write_ms = 0.0
+
+    def start_worker(self):
+        """Start the worker thread, or a new one if the last one died"""
+        if self.worker is not None and self.worker.is_alive():
+            return
+        self.worker = threading.Thread(target=self.work, name='autosave', daemon=True)
+        self.worker.start()
+
+    def update(self, game, dt):
+        """Advance the autosave timer by dt milliseconds of game time, saving when it runs out"""
+        if self.interval_ms <= 0:
+            return False
+        self.timer += dt
+        if self.timer < self.interval_ms:
+            return False
+        self.timer = 0
+        return self.save(game, self.path)
+
+    def save(self, game, path):
+        """Snapshot the game now and write it in the background"""
+        if not self.idle.is_set():
+            self.skipped += 1
+            print("Save skipped: still writing the previous one")
+            return False
+        try:
+            snapshot = capture_game(game)
+        except ValueError as e:
+            print(f"Could not save game to {path}: {e}")
+            return False
+        self.start_worker()
+        self.idle.clear()
+        self.requests.put((snapshot, path))
+        return True
+
+    def work(self):
+        """Worker thread: write snapshots as they come in"""
+        while True:
+            snapshot, path = self.requests.get()
+            start = time.perf_counter()
+            try:
+                write_snapshot(snapshot, path)
+                self.saves += 1
+                self.last_write_ms = (time.perf_counter() - start) * 1000
+                print(f"Saved game to {path} ({self.last_write_ms:.1f} ms)")
+            except Exception as e:
+                # Whatever went wrong, the thread lives on for the next save
+                print(f"Could not save game to {path}: {e}")
+            finally:
+                snapshot.release()
+                self.idle.set()
+
+    def wait(self):
+        """Block until the save in flight (if any) is written"""
+        while not self.idle.wait(0.1):
+            if not self.worker.is_alive():
+                # The thread died with the save: nothing is coming, and the next save starts a new one
+                print("Save worker stopped before finishing the save")
+                self.idle.set()
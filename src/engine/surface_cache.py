@@ -0,0 +1,158 @@
+# engine/surface_cache.py
+"""
+Caches zoomed copies of tile and sprite surfaces so they are only scaled once per zoom level.
+
+Surfaces with a mipmap pyramid (see utils.loader.build_mipmaps) are served straight from it at the
+pre-scaled zoom levels; other zooms are shrunk from the nearest larger level. The pyramid is
+smoothscaled, so it is skipped while smooth scaling is off.
+"""
+from collections import OrderedDict
+from constants import SCALE_CACHE_MAX_BYTES, SCALE_CACHE_ZOOM_STEP, SCALE_CACHE_ZOOM_JUMP
+from utils.loader import scale_surface, surface_bytes
+
+
+class SurfaceLRU:
+    """Surfaces by key, dropping the least recently used once they pass a memory cap"""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # Oldest first
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, key):
+        """Get a surface and mark it as recently used, or None on a miss"""
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+        return surface
+
+    def add(self, key, surface):
+        """Add a surface, evicting old ones if the cache is over its cap"""
+        self.entries[key] = surface
+        self.total_bytes += surface_bytes(surface)
+        self.evict()
+
+    def remove(self, key):
+        """Remove one surface"""
+        self.total_bytes -= surface_bytes(self.entries.pop(key))
+
+    def evict(self):
+        """Remove least recently used surfaces until the cache fits its memory cap"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, surface = self.entries.popitem(last=False)
+            self.total_bytes -= surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every surface"""
+        self.entries.clear()
+        self.total_bytes = 0
+
+
+class ScaledSurfaceCache:
+    def __init__(self, max_bytes=SCALE_CACHE_MAX_BYTES, zoom_step=SCALE_CACHE_ZOOM_STEP,
+                 zoom_jump=SCALE_CACHE_ZOOM_JUMP):
+        self.zoom_step = zoom_step
+        self.zoom_jump = zoom_jump
+
+        # (source surface, quantized zoom) -> scaled surface
+        self.entries = SurfaceLRU(max_bytes)
+        self.last_zoom = None
+
+        # Smooth scaling on misses; the quality governor can switch to cheaper nearest-neighbour
+        self.smooth = True
+
+        # Source surface -> {zoom level: pre-scaled surface}, kept for the whole session
+        self.mipmaps = {}
+        self.mipmap_bytes = 0
+
+        # Counters for the debug panel
+        self.mipmap_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    def quantize_zoom(self, zoom):
+        """Snap a zoom level to the cache grid so nearby zooms share entries"""
+        return round(round(zoom / self.zoom_step) * self.zoom_step, 4)
+
+    def get(self, surface, zoom):
+        """Get the surface scaled to the given zoom, scaling it on a miss"""
+        zoom_key = self.quantize_zoom(zoom)
+
+        # Nearest-neighbour scaling is always done from the full-size source
+        pyramid = self.mipmaps.get(surface) if self.smooth else None
+        if pyramid is not None:
+            level = pyramid.get(zoom_key)
+            if level is not None:
+                self.mipmap_hits += 1
+                return level
+
+        self.check_zoom_jump(zoom_key)
+
+        key = (surface, zoom_key)
+        scaled = self.entries.get(key)
+        if scaled is not None:
+            self.hits += 1
+            return scaled
+
+        self.misses += 1
+        width, height = surface.get_size()
+        source = self.get_mipmap_source(surface, pyramid, zoom_key)
+        scaled = scale_surface(source, (int(width * zoom_key), int(height * zoom_key)), self.smooth)
+        self.entries.add(key, scaled)
+        return scaled
+
+    def add_mipmaps(self, mipmaps):
+        """Register pre-scaled mipmap pyramids, keyed by source surface"""
+        for surface, pyramid in mipmaps.items():
+            if surface in self.mipmaps:
+                continue
+            self.mipmaps[surface] = pyramid
+            self.mipmap_bytes += sum(surface_bytes(level) for level in pyramid.values())
+
+    def set_smooth(self, smooth):
+        """Switch smooth scaling on or off, returning True if it changed"""
+        if smooth == self.smooth:
+            return False
+        self.smooth = smooth
+        self.clear()  # Rescale everything the new way (nearest-neighbour copies are cheap to make)
+        return True
+
+    def get_mipmap_source(self, surface, pyramid, zoom_key):
+        """Pick the surface to scale from: the nearest larger mipmap level when shrinking"""
+        if pyramid is None or zoom_key >= 1.0:
+            return surface
+        larger = [level for level in pyramid if zoom_key < level < 1.0]
+        if not larger:
+            return surface
+        return pyramid[min(larger)]
+
+    def check_zoom_jump(self, zoom_key):
+        """Drop everything when the zoom jumps far enough that old entries won't be reused"""
+        if self.last_zoom is not None and abs(zoom_key - self.last_zoom) > self.zoom_jump:
+            self.clear()
+        self.last_zoom = zoom_key
+
+    def clear(self):
+        """Remove all cached surfaces (counters are kept)"""
+        self.entries.clear()
+
+    def get_stats(self):
+        """Get cache counters for display"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.entries.evictions,
+            'entries': len(self.entries),
+            'bytes': self.entries.total_bytes,
+            'mipmap_hits': self.mipmap_hits,
+            'mipmap_bytes': self.mipmap_bytes,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,140 @@
+# engine/terrain_layer.py
+"""
+Pre-renders the static ground into chunk surfaces so each frame only blits a few chunks.
+"""
+import pygame
+from constants import SCREEN_W, SCREEN_H, TILE_W, TERRAIN_CHUNK_SIZE, TERRAIN_CHUNK_MAX_PX, \
+    TERRAIN_CACHE_MAX_BYTES, TILE_TYPES
+from engine.render_manager import RenderLayer
+from engine.surface_cache import SurfaceLRU
+from utils.loader import rotate_world_coords_90_cw
+
+
+class TerrainLayer(RenderLayer):
+    def __init__(self, tileset, renderer, max_bytes=TERRAIN_CACHE_MAX_BYTES):
+        self.tileset = tileset
+        self.renderer = renderer
+        self.fallback_tile = list(tileset.values())[0]
+        # Tile code -> image, matching the codes stored in GameMap
+        self.tile_images = [tileset.get(tile_type, self.fallback_tile) for tile_type in TILE_TYPES]
+
+        # (view key, chunk x, chunk y) -> chunk surface
+        self.chunks = SurfaceLRU(max_bytes)
+
+    def get_chunk_size(self, zoom):
+        """Get the chunk size in tiles, shrinking it when zoomed in so surfaces stay small"""
+        size = TERRAIN_CHUNK_SIZE
+        while size > 2 and size * TILE_W * zoom > TERRAIN_CHUNK_MAX_PX:
+            size //= 2
+        return size
+
+    def get_view_key(self, camera, rotation):
+        """Get the key that identifies one zoom level and rotation"""
+        effective_tile_w, effective_tile_h = camera.get_effective_tile_size()
+        return (self.renderer.scale_cache.quantize_zoom(camera.zoom),
+                effective_tile_w // 2, effective_tile_h // 2, rotation)
+
+    def draw(self, camera, game_map, rotation=0):
+        """Queue the visible terrain chunks on the renderer in back-to-front order"""
+        zoom = camera.zoom
+        view_key = self.get_view_key(camera, rotation)
+        chunk_size = self.get_chunk_size(view_key[0])
+        tile_w, tile_h = self.get_tile_size(zoom)
+
+        # Chunks are cut from the rotated view of the map, so everything here is in view coordinates
+        view_w, view_h = game_map.get_view_size(rotation)
+        min_x, max_x, min_y, max_y = camera.get_visible_tile_bounds(view_w, view_h)
+        chunk_x_range = range(min_x // chunk_size, max_x // chunk_size + 1)
+        chunk_y_range = range(min_y // chunk_size, max_y // chunk_size + 1)
+
+        # Chunks with a lower x+y are further back, like tiles
+        visible = sorted(((cx, cy) for cx in chunk_x_range for cy in chunk_y_range),
+                         key=lambda chunk: (chunk[0] + chunk[1], chunk[0]))
+
+        for cx, cy in visible:
+            x0, y0 = cx * chunk_size, cy * chunk_size
+            x1 = min(view_w, x0 + chunk_size) - 1
+            y1 = min(view_h, y0 + chunk_size) - 1
+
+            # Screen position of the chunk's top-left corner (same rounding as per-tile drawing)
+            dest_x = camera.view_to_screen(x0, y1)[0] - tile_w // 2
+            dest_y = camera.view_to_screen(x0, y0)[1] - tile_h // 2
+
+            surface = self.get_chunk(view_key, cx, cy, chunk_size, game_map, camera, tile_w, tile_h)
+            if (dest_x >= SCREEN_W or dest_y >= SCREEN_H or
+                    dest_x + surface.get_width() <= 0 or dest_y + surface.get_height() <= 0):
+                continue
+            self.renderer.queue_blit(surface, (dest_x, dest_y))
+
+    def draw_ground(self, view):
+        """Render pipeline hook: the ground lies under every sprite"""
+        self.draw(view.camera, view.game_map, view.rotation)
+
+    def get_tile_size(self, zoom):
+        """Get the largest scaled tile image size"""
+        sizes = [self.renderer.get_scaled(img, zoom).get_size() for img in self.tileset.values()]
+        return max(size[0] for size in sizes), max(size[1] for size in sizes)
+
+    def get_chunk(self, view_key, cx, cy, chunk_size, game_map, camera, tile_w, tile_h):
+        """Get a chunk surface, building it on a miss"""
+        key = (view_key, cx, cy)
+        surface = self.chunks.get(key)
+        if surface is not None:
+            return surface
+
+        surface = self.build_chunk(cx, cy, chunk_size, game_map, camera, tile_w, tile_h, view_key[3])
+        self.chunks.add(key, surface)
+        return surface
+
+    def build_chunk(self, cx, cy, chunk_size, game_map, camera, tile_w, tile_h, rotation=0):
+        """Render one chunk of the map (as seen at a rotation) into its own surface"""
+        zoom = camera.zoom
+        effective_tile_w, effective_tile_h = camera.get_effective_tile_size()
+        half_w, half_h = int(effective_tile_w // 2), int(effective_tile_h // 2)
+
+        view_w, view_h = game_map.get_view_size(rotation)
+        x0, y0 = cx * chunk_size, cy * chunk_size
+        x1 = min(view_w, x0 + chunk_size) - 1
+        y1 = min(view_h, y0 + chunk_size) - 1
+
+        # Tile centers relative to the world origin, before the camera offset
+        min_px = (x0 - y1) * half_w
+        max_px = (x1 - y0) * half_w
+        min_py = (x0 + y0) * half_h
+        max_py = (x1 + y1) * half_h
+        origin_x = min_px - tile_w // 2
+        origin_y = min_py - tile_h // 2
+
+        surface = pygame.Surface((max_px - min_px + tile_w, max_py - min_py + tile_h), pygame.SRCALPHA)
+
+        # The chunk's tile codes in one slice, and each tile image scaled once
+        codes = game_map.get_region(x0, y0, x1, y1, rotation).tolist()
+        images = [self.renderer.get_scaled(img, zoom) for img in self.tile_images]
+
+        # Same back-to-front order as the per-tile draw list: by x+y, then x
+        tiles = sorted(((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)),
+                       key=lambda tile: (tile[0] + tile[1], tile[0]))
+        for x, y in tiles:
+            img = images[codes[x - x0][y - y0]]
+            img_w, img_h = img.get_size()
+            px = (x - y) * half_w - origin_x
+            py = (x + y) * half_h - origin_y
+            surface.blit(img, (px - img_w // 2, py - img_h // 2))
+        return surface
+
+    def invalidate_tile(self, game_map, x, y):
+        """Drop the chunks containing a changed tile, for every zoom level and rotation"""
+        # Work out where the world tile sits in each of the four views of the map
+        positions = {rotation: rotate_world_coords_90_cw(x, y, game_map.w, game_map.h, rotation)
+                     for rotation in range(4)}
+
+        for key in list(self.chunks):
+            view_key, cx, cy = key
+            tile_x, tile_y = positions[view_key[3]]
+            chunk_size = self.get_chunk_size(view_key[0])
+            if tile_x // chunk_size == cx and tile_y // chunk_size == cy:
+                self.chunks.remove(key)
+
+    def invalidate_all(self):
+        """Drop every cached chunk"""
+        self.chunks.clear()
@@ -1,9 +1,46 @@
+from utils.loader import rotate_direction_90_cw
+
+
+def add_to_list(entities, entity):
+    """Append an entity to a monster or resource list, remembering its position"""
+    entity.list_position = len(entities)
+    entities.append(entity)
+
+
+def remove_from_list(entities, entity):
+    """Remove an entity from a monster or resource list in O(1): the last entity takes its place"""
+    position = entity.list_position
+    if position is None or position >= len(entities) or entities[position] is not entity:
+        # Not a list kept with add_to_list/number_list
+        entities.remove(entity)
+        return
+    last = entities.pop()
+    if last is not entity:
+        entities[position] = last
+        last.list_position = position
+    entity.list_position = None
+
+
+def number_list(entities):
+    """Record every entity's position after a list was filled or replaced wholesale"""
+    for position, entity in enumerate(entities):
+        entity.list_position = position
+
+
 class Entity:
     def __init__(self, x, y, img, hp=10):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position at the start of the current simulation tick
+        self.prev_y = y
         self.img = img
         self.hp = hp
+
+        # The spatial hash (world/spatial_hash.py) this entity is in, and its cell there
+        self.spatial_index = None
+        self.spatial_cell = None
+        # Where it is in the entity manager's monster or resource list (see remove_from_list)
+        self.list_position = None
         
         # Animation properties
         self.anim_frame = 0
@@ -18,6 +55,25 @@ class Entity:
         self.current_anim = 'idle'
         self.was_moving = False  # Track previous movement state
         
+    def set_position(self, x, y):
+        """Move to a tile, keeping the spatial hash up to date"""
+        self.x = x
+        self.y = y
+        if self.spatial_index is not None:
+            self.spatial_index.move(self)
+
+    def begin_tick(self):
+        """Remember the position at the start of a simulation tick (for render interpolation)"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def get_render_position(self, alpha=1.0):
+        """Get the position to draw at, alpha of the way from the previous tick to the current one"""
+        if alpha >= 1.0 or (self.prev_x == self.x and self.prev_y == self.y):
+            return self.x, self.y
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
     def update_animation(self, dt):
         """Update animation based on time passed"""
         # Only animate if we have animation frames
@@ -71,21 +127,29 @@ class Entity:
                 # Gradually reduce move_timer when not moving
                 self.move_timer = max(0, self.move_timer - dt * 2)
     
-    def get_current_frames(self):
+    def get_view_facing(self, rotation=0):
+        """Get the direction the entity faces on screen when the world is viewed rotated"""
+        # facing is kept in world terms; a clockwise view turn makes world east look north
+        if not rotation:
+            return self.facing
+        return rotate_direction_90_cw(self.facing, -rotation)
+
+    def get_current_frames(self, rotation=0):
         """Get the current animation frames based on state"""
         if isinstance(self.img, dict):
+            facing = self.get_view_facing(rotation)
             if 'idle' in self.img and 'walk' in self.img:
                 anim_dict = self.img.get(self.current_anim, {})
                 if anim_dict:
-                    return anim_dict.get(self.facing, [])
-            elif self.facing in self.img:
-                return self.img.get(self.facing, [])
+                    return anim_dict.get(facing, [])
+            elif facing in self.img:
+                return self.img.get(facing, [])
         return []
     
-    def get_current_frame(self):
-        """Get the current frame to display"""
+    def get_current_frame(self, rotation=0):
+        """Get the current frame to display (facing the right way for a rotated view)"""
         if isinstance(self.img, dict):
-            frames = self.get_current_frames()
+            frames = self.get_current_frames(rotation)
             if frames:
                 return frames[self.anim_frame % len(frames)]
             return None
@@ -3,17 +3,24 @@
 Manages all game entities (player, monsters, resources).
 """
 import pygame
+import numpy as np
 from constants import *
 import random
 from constants import MONSTER_COUNT, RESOURCE_COUNT
+from entities.base_entity import add_to_list, remove_from_list, number_list
 from entities.player import Player
 from entities.monster import Monster
 from entities.resource import Resource
+from world.chunk_store import ENTITY_DTYPE, ENTITY_MONSTER, ENTITY_RESOURCE
+from world.spatial_hash import SpatialHash
 
 
 class EntityManager:
-    def __init__(self, game_map, player_animations, monster_animations, resource_sprite):
+    def __init__(self, game_map, player_animations, monster_animations, resource_sprite,
+                 monster_count=MONSTER_COUNT, resource_count=RESOURCE_COUNT):
         self.game_map = game_map
+        self.monster_count = monster_count
+        self.resource_count = resource_count
         self.player_animations = player_animations
         self.monster_animations = monster_animations
         self.resource_sprite = resource_sprite
@@ -23,78 +30,188 @@ class EntityManager:
         self.monsters = []
         self.resources = []
 
+        # Where everything stands: the player, monsters and resources all share one spatial hash
+        self.index = SpatialHash()
+
+        # Simulation ticks so far, and how often distant monsters animate (set by the quality governor)
+        self.tick = 0
+        self.distant_anim_step = 1
+
+        # Loaded chunks whose entities changed chunk since their world file records were last written
+        self.moved_chunks = set()
+
+    def begin_tick(self):
+        """Record where the moving entities start the simulation tick"""
+        self.player.begin_tick()
+        for monster in self.monsters:
+            monster.begin_tick()
+
     def update(self, dt):
         """Update all entities"""
         self.player.update_animation(dt)
-        for monster in self.monsters:
-            monster.update_animation(dt)
+        self.tick += 1
+
+        # Far from the player, monsters may animate only every distant_anim_step ticks
+        step = self.distant_anim_step
+        px, py = self.player.x, self.player.y
+        paged = self.game_map.store is not None
+        moves = []
+        for i, monster in enumerate(self.monsters):
+            if step > 1 and max(abs(monster.x - px), abs(monster.y - py)) > QUALITY_DISTANT_TILES:
+                # Staggered, so each tick animates an even share of the distant monsters
+                if (i + self.tick) % step == 0:
+                    monster.update_animation(dt * step)
+            else:
+                monster.update_animation(dt)
+            x, y = monster.x, monster.y
             monster.update_ai(self.game_map)
+            if paged and (monster.x != x or monster.y != y):
+                moves.append((x, y, monster.x, monster.y))
+
+        # After the loop: loading a chunk can page other chunks' monsters out of the list
+        for move in moves:
+            self.note_moved(*move)
         
-    def initialize(self, player_start_x, player_start_y):
-        """Initialize all entities"""
+    def initialize(self, player_start_x, player_start_y, spawn=True):
+        """Initialize all entities (spawn is False for a saved world, whose entities load with its chunks)"""
         # Create player
         self.player = Player(player_start_x, player_start_y, self.player_animations)
+        self.index.insert(self.player)
+        if not spawn:
+            return
         
         # Create monsters
         self.monsters = self.create_monsters()
         
         # Create resources
         self.resources = self.create_resources()
-            
+
+    def rebuild_index(self):
+        """Index the current player, monsters and resources from scratch (after they were replaced wholesale)"""
+        self.index.rebuild([self.player], self.monsters, self.resources)
+        number_list(self.monsters)
+        number_list(self.resources)
+
+    def on_chunk(self, game_map, cx, cy, loaded):
+        """Chunk listener: page a chunk's monsters and resources in from the world file or out to it"""
+        if game_map.store is None:
+            return
+        if loaded:
+            self.load_chunk_entities(cx, cy)
+        else:
+            self.unload_chunk_entities(cx, cy)
+
+    def load_chunk_entities(self, cx, cy):
+        """Create the monsters and resources stored for a chunk (its record stays in the file until rewritten)"""
+        records = self.game_map.store.read_entities(cx, cy)
+        chunk_size = self.game_map.chunk_size
+        for record in records:
+            x = cx * chunk_size + int(record['x'])
+            y = cy * chunk_size + int(record['y'])
+            if record['kind'] == ENTITY_MONSTER:
+                monster = Monster(x, y, self.monster_animations)
+                monster.hp = int(record['hp'])
+                add_to_list(self.monsters, monster)
+                self.index.insert(monster)
+            else:
+                resource = Resource(x, y, self.resource_sprite)
+                add_to_list(self.resources, resource)
+                self.index.insert(resource)
+
+    def note_moved(self, old_x, old_y, new_x, new_y):
+        """Track a monster stepping between chunks, so the world file never holds it twice or not at all"""
+        game_map = self.game_map
+        old_key = game_map.get_chunk_key(old_x, old_y)
+        new_key = game_map.get_chunk_key(new_x, new_y)
+        if old_key == new_key:
+            return
+        self.moved_chunks.update((old_key, new_key))
+        # Entities in memory always stand in loaded chunks: their records are the ones rewritten from memory
+        if not game_map.is_chunk_loaded(*new_key):
+            game_map.get_chunk(*new_key)
+
+    def unload_chunk_entities(self, cx, cy):
+        """Write a chunk's monsters and resources to the world file and drop them from memory"""
+        self.write_chunk_entities(cx, cy, self.get_chunk_entities(cx, cy), drop=True)
+
+        # Chunks that monsters walked in or out of are rewritten with it, so the file stays consistent
+        for key in self.moved_chunks:
+            if key != (cx, cy) and self.game_map.is_chunk_loaded(*key):
+                self.write_chunk_entities(key[0], key[1], self.get_chunk_entities(*key))
+        self.moved_chunks.clear()
+
+    def save_all(self):
+        """Write every loaded chunk's monsters and resources to the world file (keeping them in memory)
+
+        Entities outside the loaded chunks (just spawned in a new world) are added to their chunk's
+        record and dropped from memory; they load again with the chunk.
+        """
+        game_map = self.game_map
+        chunks = {key: [] for key in game_map.chunks}
+        for entity in self.monsters + self.resources:
+            chunks.setdefault(game_map.get_chunk_key(entity.x, entity.y), []).append(entity)
+        for (cx, cy), entities in chunks.items():
+            loaded = game_map.is_chunk_loaded(cx, cy)
+            self.write_chunk_entities(cx, cy, entities, drop=not loaded, append=not loaded)
+        self.moved_chunks.clear()
+
+    def get_chunk_entities(self, cx, cy):
+        """Get the monsters and resources standing in a chunk"""
+        size = self.game_map.chunk_size
+        entities = self.index.query_rect(cx * size, cy * size, cx * size + size - 1, cy * size + size - 1)
+        return [e for e in entities if isinstance(e, (Monster, Resource))]
+
+    def write_chunk_entities(self, cx, cy, entities, drop=False, append=False):
+        """Replace a chunk's entity record (or add to it) with these entities, dropping them from memory if asked"""
+        store = self.game_map.store
+        chunk_size = self.game_map.chunk_size
+        records = np.zeros(len(entities), dtype=ENTITY_DTYPE)
+        for i, entity in enumerate(entities):
+            records[i] = (ENTITY_MONSTER if isinstance(entity, Monster) else ENTITY_RESOURCE,
+                          entity.x - cx * chunk_size, entity.y - cy * chunk_size, max(0, min(255, entity.hp)))
+        if append:
+            stored = store.add_entities(cx, cy, records)
+        else:
+            stored = store.write_entities(cx, cy, records)
+        if stored < len(entities):
+            print(f"World file: chunk {(cx, cy)} is full, keeping {len(entities) - stored} entities in memory")
+        if not drop or not stored:
+            return
+
+        # Remove in place: the game holds on to these lists
+        for entity in entities[:stored]:
+            self.index.remove(entity)
+            remove_from_list(self.monsters if isinstance(entity, Monster) else self.resources, entity)
+
     def create_monsters(self):
         """Create monster entities"""
         monsters = []
-        for _ in range(MONSTER_COUNT):
-            x = random.randrange(0, MAP_W)
-            y = random.randrange(0, MAP_H)
+        for _ in range(self.monster_count):
+            x = random.randrange(0, self.game_map.w)
+            y = random.randrange(0, self.game_map.h)
             monster = Monster(x, y, self.monster_animations)
-            monsters.append(monster)
+            add_to_list(monsters, monster)
+            self.index.insert(monster)
         return monsters
 
     def create_resources(self):
         """Create resource entities with unique positions"""
         resources = []
-        resource_positions = set()
 
-        for _ in range(RESOURCE_COUNT):
+        for _ in range(self.resource_count):
             attempts = 0
             while attempts < 100:
-                x = random.randrange(0, MAP_W)
-                y = random.randrange(0, MAP_H)
-
-                # Check if position is occupied
-                if (x, y) not in resource_positions:
-                    player_here = (x == self.player.x and y == self.player.y)
-                    monster_here = any(m.x == x and m.y == y for m in self.monsters)
+                x = random.randrange(0, self.game_map.w)
+                y = random.randrange(0, self.game_map.h)
 
-                    if not player_here and not monster_here:
-                        resource = Resource(x, y, self.resource_sprite)
-                        resources.append(resource)
-                        resource_positions.add((x, y))
-                        break
+                # Check if position is occupied (by the player, a monster or another resource)
+                if not self.index.query_tile(x, y):
+                    resource = Resource(x, y, self.resource_sprite)
+                    add_to_list(resources, resource)
+                    self.index.insert(resource)
+                    break
 
                 attempts += 1
 
         print(f"Generated {len(resources)} resources in the world")
         return resources
-
-    def adjust_entities_for_rotation(self):
-        """Adjust all entity positions for the current rotation"""
-        map_w, map_h = self.game_map.w, self.game_map.h
-
-        # Adjust player position
-        self.player.x, self.player.y = self.rotate_point_90_cw(
-            self.player.x, self.player.y, map_w, map_h
-        )
-
-        # Adjust monster positions
-        for monster in self.monsters:
-            monster.x, monster.y = self.rotate_point_90_cw(
-                monster.x, monster.y, map_w, map_h
-            )
-
-        # Adjust resource positions
-        for resource in self.resources:
-            resource.x, resource.y = self.rotate_point_90_cw(
-                resource.x, resource.y, map_w, map_h
-            )
\ No newline at end of file
@@ -22,7 +22,6 @@ class Monster(Entity):
                 
                 # Check bounds
                 if 0 <= new_x < game_map.w and 0 <= new_y < game_map.h:
-                    self.x = new_x
-                    self.y = new_y
+                    self.set_position(new_x, new_y)
             else:
                 self.is_moving = False
\ No newline at end of file
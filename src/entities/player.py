@@ -1,4 +1,6 @@
-from entities.base_entity import Entity
+from entities.base_entity import Entity, remove_from_list
+from entities.monster import Monster
+from entities.resource import Resource
 import constants
 
 
@@ -16,30 +18,42 @@ class Player(Entity):
 
         # Check bounds
         if 0 <= new_x < game_map.w and 0 <= new_y < game_map.h:
-            self.x = new_x
-            self.y = new_y
+            self.set_position(new_x, new_y)
             self.set_facing_direction(dx, dy)
             return True
         return False
 
     def attack(self, monsters):
         """Attack adjacent monsters"""
+        if self.spatial_index is not None:
+            # Only the four tiles next to the player can hold a target
+            targets = [e for e in self.spatial_index.query_neighbors(self.x, self.y) if isinstance(e, Monster)]
+        else:
+            targets = [m for m in monsters if abs(m.x - self.x) + abs(m.y - self.y) == 1]
+
         attacked = False
-        for monster in monsters[:]:
-            if abs(monster.x - self.x) + abs(monster.y - self.y) == 1:
-                monster.hp -= 6
-                monster.anim_timer = 0
-                monster.current_anim = 'walk'
-                monster.move_timer = 0
-                if monster.hp <= 0:
-                    monsters.remove(monster)
-                attacked = True
+        for monster in targets:
+            monster.hp -= 6
+            monster.anim_timer = 0
+            monster.current_anim = 'walk'
+            monster.move_timer = 0
+            if monster.hp <= 0:
+                remove_from_list(monsters, monster)
+                if monster.spatial_index is not None:
+                    monster.spatial_index.remove(monster)
+            attacked = True
         return attacked
 
     def gather_resource(self, resources, inventory=None):
         """Gather resource at current position"""
-        for resource in resources[:]:
-            if resource.x == self.x and resource.y == self.y and not resource.collected:
+        if self.spatial_index is not None:
+            # Resources share the player's spatial hash, so only this tile is looked at
+            candidates = [e for e in self.spatial_index.query_tile(self.x, self.y) if isinstance(e, Resource)]
+        else:
+            candidates = [r for r in resources if r.x == self.x and r.y == self.y]
+
+        for resource in candidates:
+            if not resource.collected:
                 if inventory:
                     # Use the new inventory system
                     inventory.add_item('resource', 1)
@@ -48,7 +62,9 @@ class Player(Entity):
                     self.inv['resource'] = self.inv.get('resource', 0) + 1
                 
                 resource.collected = True
-                resources.remove(resource)
+                remove_from_list(resources, resource)
+                if resource.spatial_index is not None:
+                    resource.spatial_index.remove(resource)
                 return True
         return False
     
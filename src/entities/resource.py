@@ -11,6 +11,6 @@ class Resource(Entity):
         """Resources don't animate - override parent method"""
         pass
     
-    def get_current_frame(self):
-        """Resources just return their static image"""
+    def get_current_frame(self, rotation=0):
+        """Resources just return their static image (the same from every side)"""
         return self.img
\ No newline at end of file
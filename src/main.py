@@ -1,10 +1,17 @@
+import argparse
 import traceback
+from constants import WORLD_FILE
 from engine.game import Game
 
 
 def main():
+    parser = argparse.ArgumentParser(description='IsoRealm')
+    parser.add_argument('--world', default=WORLD_FILE,
+                        help='persistent world file, created on first use and saved on exit')
+    args = parser.parse_args()
+
     try:
-        game = Game()
+        game = Game(world_file=args.world)
         game.run()
     except Exception as e:
         print('Error running game:', e)
@@ -13,4 +20,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
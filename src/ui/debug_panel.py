@@ -1,6 +1,7 @@
 import pygame
 from constants import *
 from ui.ui import UI
+from ui.text_cache import text_cache
 
 class DebugPanel:
     def __init__(self, screen):
@@ -10,6 +11,9 @@ class DebugPanel:
         self.tiny_font = pygame.font.SysFont(None, 16)
         self.large_font = pygame.font.SysFont(None, 32)
 
+        # Radius -> grid dot sprite
+        self.grid_dots = {}
+
         # Colors
         self.colors = {
             'ui_bg': COLOR_UI_BG,
@@ -30,13 +34,27 @@ class DebugPanel:
 
         self.ui = UI(self.screen)
 
+        # Screen area the debug text can cover (used for dirty-rect tracking)
+        self.rect = pygame.Rect(0, SCREEN_H - 225, 720, 225)
+
+        # Frame profiler panel (top right): a scrolling stacked bar graph over a percentile table
+        self.bar_width = 2
+        self.graph_rect = pygame.Rect(10, 28, PROFILER_HISTORY * self.bar_width, 80)
+        self.profiler_rect = pygame.Rect(SCREEN_W - 330, 10, 320, 270)
+        self.profiler_panel = pygame.Surface(self.profiler_rect.size)
+        self.profiler_graph = self.profiler_panel.subsurface(self.graph_rect)
+        self.profiler_frames = None  # Profiler frame count the panel was last drawn for
+        self.profiler_generation = None
+        self.profiler_stats_frame = None
+
     # ui.py - add zoom parameter to draw_debug_info
-    def draw_debug_info(self, sprite_status, all_loaded_files, clock, player, zoom=1.0, show_debug=False):
+    def draw_debug_info(self, sprite_status, all_loaded_files, clock, player, zoom=1.0, show_debug=False,
+                        scale_cache_stats=None, quality_level=None):
         """Draw debug information panel (only if show_debug is True)"""
         if not show_debug:
             return
             
-        debug_y = SCREEN_H - 180
+        debug_y = SCREEN_H - 220
 
         # Sprite status header with shadow
         self.ui.draw_text_with_shadow(
@@ -57,9 +75,34 @@ class DebugPanel:
 
         # File info and FPS with shadow - include zoom info
         file_info = f"Total files loaded: {len(all_loaded_files)} | FPS: {int(clock.get_fps())} | Zoom: {zoom:.1f}x"
+        if quality_level is not None:
+            file_info += f" | Quality: {quality_level}"
+        # Lines below change every frame, so they are rendered directly rather than churning the text cache
         self.ui.draw_text_with_shadow(
             file_info, self.small_font, self.colors['debug'],
-            8, debug_y
+            8, debug_y, cache=False
+        )
+        debug_y += 20
+
+        # Scaled surface cache counters
+        if scale_cache_stats:
+            cache_info = (f"Scale cache: {scale_cache_stats['hits']} hits | {scale_cache_stats['misses']} misses | "
+                          f"{scale_cache_stats['hit_rate'] * 100:.1f}% | {scale_cache_stats['entries']} surfaces | "
+                          f"{scale_cache_stats['bytes'] // 1024} KB | "
+                          f"mipmaps: {scale_cache_stats['mipmap_hits']} hits, {scale_cache_stats['mipmap_bytes'] // 1024} KB")
+            self.ui.draw_text_with_shadow(
+                cache_info, self.small_font, self.colors['debug'],
+                8, debug_y, cache=False
+            )
+            debug_y += 20
+
+        # Shared text cache counters
+        text_stats = text_cache.get_stats()
+        text_info = (f"Text cache: {text_stats['hits']} hits | {text_stats['misses']} misses | "
+                     f"{text_stats['hit_rate'] * 100:.1f}% | {text_stats['entries']} strings")
+        self.ui.draw_text_with_shadow(
+            text_info, self.small_font, self.colors['debug'],
+            8, debug_y, cache=False
         )
         debug_y += 20
 
@@ -72,23 +115,112 @@ class DebugPanel:
         for i, line in enumerate(player_info):
             self.ui.draw_text_with_shadow(
                 line, self.small_font, self.colors['text_highlight'],
-                8, debug_y + i * 18
+                8, debug_y + i * 18, cache=False
             )
 
+    def draw_profiler(self, profiler, show_debug=False):
+        """Draw the frame phase graph and its p50/p95/p99 table"""
+        if not show_debug:
+            return
+
+        if profiler.generation != self.profiler_generation:
+            self.build_profiler_panel()
+            self.profiler_generation = profiler.generation
+            self.profiler_frames = profiler.frames - profiler.count
+
+        # Only the columns for frames recorded since the last draw are painted
+        new_frames = min(profiler.frames - self.profiler_frames, profiler.count)
+        for age in range(new_frames - 1, -1, -1):
+            self.add_profiler_column(profiler.get_frame(age), profiler.colors)
+        self.profiler_frames = profiler.frames
+
+        # Rebuilding the table every frame would flicker and churn the text cache
+        if (self.profiler_stats_frame is None or
+                profiler.frames - self.profiler_stats_frame >= PROFILER_STATS_INTERVAL):
+            self.draw_profiler_stats(profiler)
+            self.profiler_stats_frame = profiler.frames
+
+        self.screen.blit(self.profiler_panel, self.profiler_rect.topleft)
+
+    def build_profiler_panel(self):
+        """Draw the profiler panel's background, title and empty graph"""
+        panel = self.profiler_panel
+        panel.fill(COLOR_UI_BG)
+        pygame.draw.rect(panel, COLOR_UI_BORDER, panel.get_rect(), 1)
+        title = text_cache.render(self.small_font, f"Frame time (0-{PROFILER_GRAPH_MS:.0f} ms, line = 60 FPS)",
+                                  self.colors['debug'])
+        panel.blit(title, (10, 8))
+        self.profiler_graph.fill((0, 0, 0))
+        self.profiler_stats_frame = None
+
+    def add_profiler_column(self, frame, colors):
+        """Scroll the graph left and paint one frame's stacked bar on the right"""
+        graph = self.profiler_graph
+        width, height = graph.get_size()
+        graph.scroll(-self.bar_width, 0)
+        x = width - self.bar_width
+        graph.fill((0, 0, 0), (x, 0, self.bar_width, height))
+
+        bottom = height
+        for phase, seconds in frame.items():
+            bar = int(seconds * 1000 / PROFILER_GRAPH_MS * height + 0.5)
+            if bar <= 0:
+                continue
+            top = max(0, bottom - bar)
+            graph.fill(colors[phase], (x, top, self.bar_width, bottom - top))
+            bottom = top
+            if bottom == 0:
+                break
+
+        # 60 FPS budget line
+        budget_y = height - int(1000 / FPS / PROFILER_GRAPH_MS * height)
+        graph.fill(self.colors['text_highlight'], (x, budget_y, self.bar_width, 1))
+
+    def draw_profiler_stats(self, profiler):
+        """Redraw the percentile table under the graph"""
+        panel = self.profiler_panel
+        top = self.graph_rect.bottom + 8
+        panel.fill(COLOR_UI_BG, (1, top, panel.get_width() - 2, panel.get_height() - top - 1))
+
+        for column, heading in enumerate(("phase", "p50", "p95", "p99 ms")):
+            header = text_cache.render(self.tiny_font, heading, self.colors['debug'])
+            panel.blit(header, (24 if column == 0 else 110 + column * 48, top))
+        for i, (phase, p50, p95, p99) in enumerate(profiler.get_stats()):
+            y = top + 15 + i * 14
+            if phase in profiler.colors:
+                panel.fill(profiler.colors[phase], (10, y + 2, 8, 8))
+            label = text_cache.render(self.tiny_font, phase, self.colors['text_highlight'])
+            panel.blit(label, (24, y))
+            for column, value in enumerate((p50, p95, p99)):
+                number = text_cache.render(self.tiny_font, f"{value:6.2f}", self.colors['debug'])
+                panel.blit(number, (158 + column * 48, y))
+
     def draw_grid_dots(self, visible_tiles, zoom=1.0, show_debug=False):
         """
         Draw grid dots EXACTLY at tile centers.
-        visible_tiles should be a list of dictionaries with 'screen_x', 'screen_y' keys.
+        visible_tiles should be a list of (screen_x, screen_y) tile centers.
         Only draws if show_debug is True.
         """
         if not show_debug:
             return
-            
-        for tile in visible_tiles:
-            sx, sy = tile['screen_x'], tile['screen_y']
-            # Scale dot size with zoom
-            dot_radius = max(1, int(3 * zoom))
-            # Draw a small dot EXACTLY at the tile center (sprite feet position)
-            pygame.draw.circle(self.screen, (255, 255, 255, 180), (sx, sy), dot_radius)
-            # Draw a subtle border around the dot for better visibility
-            pygame.draw.circle(self.screen, (0, 0, 0, 100), (sx, sy), dot_radius, 1)
\ No newline at end of file
+
+        # Stamp one pre-rendered dot per tile in a single batched blit
+        dot_radius = max(1, int(3 * zoom))
+        dot = self.get_grid_dot(dot_radius)
+        self.screen.blits([(dot, (sx - dot_radius, sy - dot_radius)) for sx, sy in visible_tiles],
+                          doreturn=False)
+
+    def get_grid_dot(self, dot_radius):
+        """Get the grid dot sprite for a radius, drawing it on first use"""
+        dot = self.grid_dots.get(dot_radius)
+        if dot is None:
+            size = dot_radius * 2 + 1
+            dot = pygame.Surface((size, size))
+            dot.fill(GRID_DOT_COLORKEY)
+            dot.set_colorkey(GRID_DOT_COLORKEY, pygame.RLEACCEL)
+            # A small dot EXACTLY at the tile center (sprite feet position)
+            pygame.draw.circle(dot, (255, 255, 255), (dot_radius, dot_radius), dot_radius)
+            # A subtle border around the dot for better visibility
+            pygame.draw.circle(dot, (0, 0, 0), (dot_radius, dot_radius), dot_radius, 1)
+            self.grid_dots[dot_radius] = dot
+        return dot
@@ -1,6 +1,6 @@
 import pygame
 from constants import *
-from ui.ui import UI
+from ui.ui import UI, PREMULTIPLIED_ALPHA
 
 
 class HUD:
@@ -31,9 +31,34 @@ class HUD:
 
         self.ui = UI(self.screen)
 
-    # ui.py - update draw_hud method
+        # Screen area the HUD text can cover (used for dirty-rect tracking)
+        self.rect = pygame.Rect(0, 0, 720, 140)
+
+        # The HUD is composed once into this overlay and reused until its inputs change
+        self.overlay = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.overlay_ui = UI(self.overlay, premultiplied=PREMULTIPLIED_ALPHA)
+        self.overlay_state = None
+        self.rebuilds = 0
+
+    def get_state(self, player, resources_left, rotation=0, zoom=1.0, sprite_offset=0):
+        """Get every input the HUD text depends on"""
+        return (player.hp, player.inv.get("resource", 0), resources_left, rotation,
+                f"{zoom:.1f}", sprite_offset, player.current_anim)
+
     def draw_hud(self, player, resources_left, rotation=0, zoom=1.0, sprite_offset=0):
-        """Draw the main HUD with player stats and controls"""
+        """Draw the main HUD, recomposing it only when one of its inputs changed"""
+        state = self.get_state(player, resources_left, rotation, zoom, sprite_offset)
+        if state != self.overlay_state:
+            self.overlay.fill((0, 0, 0, 0))
+            self.compose_hud(player, resources_left, rotation, zoom, sprite_offset)
+            self.overlay_state = state
+            self.rebuilds += 1
+
+        self.screen.blit(self.overlay, self.rect.topleft, special_flags=self.overlay_ui.blend_flags)
+
+    # ui.py - update draw_hud method
+    def compose_hud(self, player, resources_left, rotation=0, zoom=1.0, sprite_offset=0):
+        """Draw the HUD stats and controls onto the overlay surface"""
         hud_y = 8
 
         # Main stats
@@ -46,29 +71,29 @@ class HUD:
         offset_text = f"Sprite Offset: {sprite_offset}"
 
         hud_text = f'HP: {player.hp} | Resources: {player.inv.get("resource", 0)} | Remaining: {resources_left} | State: '
-        txt_width, _ = self.ui.draw_text_with_shadow(
+        txt_width, _ = self.overlay_ui.draw_text_with_shadow(
             hud_text, self.font, self.colors['text'], 8, hud_y
         )
 
         # Draw state text
-        self.ui.draw_text_with_shadow(
+        self.overlay_ui.draw_text_with_shadow(
             anim_state, self.font, state_color, 8 + txt_width, hud_y
         )
 
         hud_y += 25
 
         # Add rotation, zoom, and offset info
-        self.ui.draw_text_with_shadow(
+        self.overlay_ui.draw_text_with_shadow(
             rotation_text, self.font, (200, 220, 255), 8, hud_y
         )
 
         rot_txt_width, _ = self.font.size(rotation_text)
-        self.ui.draw_text_with_shadow(
+        self.overlay_ui.draw_text_with_shadow(
             zoom_text, self.font, (220, 255, 200), 8 + rot_txt_width + 20, hud_y
         )
 
         zoom_txt_width, _ = self.font.size(zoom_text)
-        self.ui.draw_text_with_shadow(
+        self.overlay_ui.draw_text_with_shadow(
             offset_text, self.font, (255, 220, 200), 8 + rot_txt_width + 20 + zoom_txt_width + 20, hud_y
         )
 
@@ -83,7 +108,7 @@ class HUD:
         ]
 
         for i, line in enumerate(controls):
-            self.ui.draw_text_with_shadow(
+            self.overlay_ui.draw_text_with_shadow(
                 line, self.small_font, self.colors['text_secondary'],
                 8, hud_y + i * 18
             )
\ No newline at end of file
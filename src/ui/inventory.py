@@ -7,6 +7,9 @@ class Inventory:
         # Initialize all slots as empty
         self.slots = [None] * TOTAL_SLOTS
         self.hotbar = [None] * HOTBAR_SLOTS
+
+        # Bumped on every change so UI panels know when to redraw
+        self.version = 0
         
         # Sync initial hotbar
         self.sync_hotbar()
@@ -26,14 +29,14 @@ class Inventory:
                 if slot and slot['type'] == item_type:
                     # Stack in hotbar
                     slot['count'] += remaining_count
-                    self.sync_hotbar()
+                    self.mark_changed()
                     return True
         
         # PHASE 2: Try to stack with existing items in other slots
         for i, slot in enumerate(self.slots):
             if slot and slot['type'] == item_type:
                 slot['count'] += remaining_count
-                self.sync_hotbar()
+                self.mark_changed()
                 return True
         
         # PHASE 3: Find empty slots, starting from HOTBAR, then going up
@@ -43,7 +46,7 @@ class Inventory:
             if inventory_slot < len(self.slots) and not self.slots[inventory_slot]:
                 # Found empty hotbar slot
                 self.slots[inventory_slot] = {'type': item_type, 'count': remaining_count}
-                self.sync_hotbar()
+                self.mark_changed()
                 return True
         
         # PHASE 4: Check remaining slots from bottom to top, left to right
@@ -54,7 +57,7 @@ class Inventory:
                 if not self.slots[slot_index]:
                     # Found empty slot
                     self.slots[slot_index] = {'type': item_type, 'count': remaining_count}
-                    self.sync_hotbar()
+                    self.mark_changed()
                     return True
         
         # No empty slots
@@ -68,7 +71,7 @@ class Inventory:
                 slot['count'] -= count
                 if slot['count'] <= 0:
                     self.slots[slot_index] = None
-                self.sync_hotbar()
+                self.mark_changed()
                 return True
         return False
     
@@ -88,6 +91,11 @@ class Inventory:
             return self.remove_item(inventory_slot, 1)
         return False
     
+    def mark_changed(self):
+        """Record that slot contents changed and re-sync the hotbar"""
+        self.version += 1
+        self.sync_hotbar()
+
     def sync_hotbar(self):
         """Sync hotbar with bottom row of inventory"""
         bottom_row_start = (INVENTORY_ROWS - 1) * INVENTORY_COLS
@@ -0,0 +1,91 @@
+# ui/text_cache.py
+"""
+Shared cache of rendered text surfaces, so unchanged HUD/debug/UI strings aren't re-rendered every frame.
+"""
+from collections import OrderedDict
+import pygame
+from constants import TEXT_CACHE_MAX_ENTRIES
+
+
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+
+        # (font, text, color, shadow color) -> rendered surface(s), oldest first
+        self.entries = OrderedDict()
+
+        # Counters for profiling
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Get text rendered with font.render, rendering it only on a miss"""
+        key = (font, text, tuple(color), None, antialias)
+        surface = self.lookup(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.store(key, surface)
+        return surface
+
+    def render_with_shadow(self, font, text, color, shadow_color, premultiplied=False, cache=True):
+        """Get the (shadow, text) surface pair used by UI.draw_text_with_shadow
+
+        Text that changes every frame (counters, FPS) should pass cache=False: it would only miss,
+        and push out the strings that do repeat.
+        """
+        if not cache:
+            return self.render_shadow_pair(font, text, color, shadow_color, premultiplied)
+        key = (font, text, tuple(color), tuple(shadow_color), premultiplied)
+        surfaces = self.lookup(key)
+        if surfaces is None:
+            surfaces = self.render_shadow_pair(font, text, color, shadow_color, premultiplied)
+            self.store(key, surfaces)
+        return surfaces
+
+    def render_shadow_pair(self, font, text, color, shadow_color, premultiplied=False):
+        """Render the (shadow, text) surface pair, uncached"""
+        shadow_alpha = shadow_color[3] if len(shadow_color) > 3 else 255
+        shadow_surf = font.render(text, True, shadow_color)
+        main_surf = font.render(text, True, color)
+        if premultiplied:
+            # For BLEND_PREMULTIPLIED blits onto cached overlays
+            shadow_surf = shadow_surf.convert_alpha().premul_alpha()
+            shadow_surf.fill((shadow_alpha,) * 4, special_flags=pygame.BLEND_RGBA_MULT)
+            main_surf = main_surf.convert_alpha().premul_alpha()
+        else:
+            shadow_surf.set_alpha(shadow_alpha)
+        return shadow_surf, main_surf
+
+    def lookup(self, key):
+        """Get a cached entry and mark it as recently used"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key, entry):
+        """Add an entry, evicting the least recently used ones past the size limit"""
+        self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached text (counters are kept)"""
+        self.entries.clear()
+
+    def get_stats(self):
+        """Get cache counters for display"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# One cache shared by every UI component
+text_cache = TextCache()
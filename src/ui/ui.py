@@ -1,11 +1,18 @@
 # ui.py
 import pygame
 from constants import *
+from ui.text_cache import text_cache
+
+# Cached overlays are composed with premultiplied alpha when pygame supports it (2.1.4+),
+# so antialiased edges look the same as text drawn straight onto the screen
+PREMULTIPLIED_ALPHA = hasattr(pygame.Surface, 'premul_alpha')
 
 
 class UI:
-    def __init__(self, screen):
+    def __init__(self, screen, premultiplied=False):
         self.screen = screen
+        self.premultiplied = premultiplied and PREMULTIPLIED_ALPHA
+        self.blend_flags = pygame.BLEND_PREMULTIPLIED if self.premultiplied else 0
         self.font = pygame.font.SysFont(None, 22)
         self.small_font = pygame.font.SysFont(None, 18)
         self.tiny_font = pygame.font.SysFont(None, 16)
@@ -29,21 +36,20 @@ class UI:
             'folder_header': (255, 255, 200)
         }
     
-    def draw_text_with_shadow(self, text, font, color, x, y, shadow_color=None, shadow_offset=(1, 1)):
-        """Draw text with a shadow behind it for better readability"""
+    def draw_text_with_shadow(self, text, font, color, x, y, shadow_color=None, shadow_offset=(1, 1), cache=True):
+        """Draw text with a shadow behind it for better readability (cache=False for text that changes every frame)"""
         if shadow_color is None:
             shadow_color = self.colors['text_shadow']
         
-        # Create shadow surface
-        shadow_surf = font.render(text, True, shadow_color)
-        shadow_surf.set_alpha(shadow_color[3] if len(shadow_color) > 3 else 255)
+        # Get shadow and main surfaces (rendered once, then reused from the shared cache)
+        shadow_surf, main_surf = text_cache.render_with_shadow(font, text, color, shadow_color, self.premultiplied,
+                                                               cache)
         
         # Draw shadow
-        self.screen.blit(shadow_surf, (x + shadow_offset[0], y + shadow_offset[1]))
+        self.screen.blit(shadow_surf, (x + shadow_offset[0], y + shadow_offset[1]), special_flags=self.blend_flags)
         
         # Draw main text
-        main_surf = font.render(text, True, color)
-        self.screen.blit(main_surf, (x, y))
+        self.screen.blit(main_surf, (x, y), special_flags=self.blend_flags)
         
         return main_surf.get_size()
 
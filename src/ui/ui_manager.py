@@ -2,6 +2,7 @@
 import pygame
 import os
 from constants import *
+from ui.text_cache import text_cache
 
 class UIManager:
     def __init__(self, screen):
@@ -35,6 +36,16 @@ class UIManager:
         # Font for UI
         self.font = pygame.font.SysFont(None, 24)
         self.small_font = pygame.font.SysFont(None, 20)
+
+        # Retained panels, redrawn only when the state they were built from changes
+        self.hotbar_panel = pygame.Surface((HOTBAR_WIDTH, HOTBAR_HEIGHT), pygame.SRCALPHA)
+        self.hotbar_panel_state = None
+        self.inventory_rect = self.get_inventory_rect()
+        self.inventory_panel = pygame.Surface(self.inventory_rect.size, pygame.SRCALPHA)
+        self.inventory_panel_state = None
+        self.panel_rebuilds = 0
+        self.count_badges = {}
+        self.tooltip_backgrounds = {}
     
     def load_texture(self, filename, width, height):
         """Load a texture file - returns None if not found"""
@@ -81,26 +92,123 @@ class UIManager:
         
         return sprites
     
+    def get_hotbar_slot_origin(self):
+        """Get the screen position of the first hotbar slot"""
+        hotbar_x, hotbar_y = self.hotbar_pos
+        start_x = hotbar_x + (HOTBAR_WIDTH - (HOTBAR_SLOTS * (SLOT_SIZE + SLOT_MARGIN))) // 2
+        start_y = hotbar_y + (HOTBAR_HEIGHT - SLOT_SIZE) // 2
+        return start_x, start_y
+
+    def get_hotbar_rect(self):
+        """Get the screen area covered by the hotbar"""
+        return pygame.Rect(self.hotbar_pos, (HOTBAR_WIDTH, HOTBAR_HEIGHT))
+
+    def get_hotbar_slot_at(self, pos):
+        """Get the hotbar slot under a screen position, or None"""
+        start_x, start_y = self.get_hotbar_slot_origin()
+        for i in range(HOTBAR_SLOTS):
+            slot_rect = pygame.Rect(start_x + i * (SLOT_SIZE + SLOT_MARGIN), start_y, SLOT_SIZE, SLOT_SIZE)
+            if slot_rect.collidepoint(pos):
+                return i
+        return None
+
+    def get_inventory_grid_origin(self):
+        """Get the screen position of the first inventory slot"""
+        inv_x, inv_y = self.inventory_pos
+        grid_width = INVENTORY_COLS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
+        grid_height = INVENTORY_ROWS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
+
+        start_x = inv_x + (INVENTORY_WIDTH - grid_width) // 2
+        start_y = inv_y + (INVENTORY_HEIGHT - grid_height) // 2
+        return start_x, start_y
+
+    def get_inventory_rect(self):
+        """Get the screen area covered by the inventory background and its slot grid"""
+        start_x, start_y = self.get_inventory_grid_origin()
+        grid_width = INVENTORY_COLS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
+        grid_height = INVENTORY_ROWS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
+
+        # The grid is wider than the background, so the panel has to cover both
+        background_rect = pygame.Rect(self.inventory_pos, (INVENTORY_WIDTH, INVENTORY_HEIGHT))
+        return background_rect.union(pygame.Rect(start_x, start_y, grid_width, grid_height))
+
+    def get_inventory_slot_at(self, pos):
+        """Get the inventory slot under a screen position, or None"""
+        start_x, start_y = self.get_inventory_grid_origin()
+        for row in range(INVENTORY_ROWS):
+            for col in range(INVENTORY_COLS):
+                slot_x = start_x + col * (SLOT_SIZE + SLOT_MARGIN)
+                slot_y = start_y + row * (SLOT_SIZE + SLOT_MARGIN)
+
+                slot_rect = pygame.Rect(slot_x, slot_y, SLOT_SIZE, SLOT_SIZE)
+                if slot_rect.collidepoint(pos):
+                    return row * INVENTORY_COLS + col
+        return None
+
+    def get_drag_source(self):
+        """Get the slot an item is being dragged from, or None"""
+        return self.dragging_from_slot if self.dragging_item else None
+
+    def get_hotbar_state(self, inventory):
+        """Get everything the hotbar's look depends on, for change detection"""
+        hovered = self.get_hotbar_slot_at(pygame.mouse.get_pos())
+        return self.selected_hotbar_slot, hovered, inventory.version, self.get_drag_source()
+
+    def get_inventory_state(self, inventory):
+        """Get everything the open inventory's look depends on, for change detection"""
+        mouse_pos = pygame.mouse.get_pos()
+        hovered = self.get_inventory_slot_at(mouse_pos)
+        # The dragged item and the tooltip follow the mouse
+        cursor = mouse_pos if self.dragging_item or hovered is not None else None
+        return inventory.version, self.selected_hotbar_slot, hovered, self.get_drag_source(), cursor
+
+    def get_inventory_cursor_rect(self, inventory):
+        """Get the screen area of the dragged item or the hover tooltip, or None when neither is shown"""
+        mouse_pos = pygame.mouse.get_pos()
+        if self.dragging_item:
+            return self.get_drag_rect(mouse_pos)
+        tooltip = self.get_item_tooltip(inventory, self.get_inventory_slot_at(mouse_pos), *mouse_pos)
+        return tooltip[2] if tooltip else None
+
+    def get_drag_rect(self, mouse_pos):
+        """Get where the dragged item is drawn for a mouse position"""
+        sprite = self.item_sprites.get(self.dragging_item['type'])
+        size = sprite.get_size() if sprite is not None else (SLOT_SIZE - 8, SLOT_SIZE - 8)
+        return pygame.Rect((mouse_pos[0] - self.drag_offset[0], mouse_pos[1] - self.drag_offset[1]), size)
+
     def draw_hotbar(self, inventory):
-        """Draw the hotbar"""
+        """Draw the hotbar from its cached panel, rebuilding the panel only when its state changed"""
+        state = self.get_hotbar_state(inventory)
+        if state != self.hotbar_panel_state:
+            self.build_hotbar_panel(inventory, state[1])
+            self.hotbar_panel_state = state
+            self.panel_rebuilds += 1
+
+        self.screen.blit(self.hotbar_panel, self.hotbar_pos)
+        return self.get_hotbar_slot_origin()
+
+    def build_hotbar_panel(self, inventory, hovered):
+        """Draw the hotbar background, slots and items onto the cached panel"""
+        panel = self.hotbar_panel
+        panel.fill((0, 0, 0, 0))
+
         # Only draw background if texture exists
         if self.hotbar_bg is not None:
-            self.screen.blit(self.hotbar_bg, self.hotbar_pos)
+            panel.blit(self.hotbar_bg, (0, 0))
         
-        # Calculate slot positions
+        # Calculate slot positions (relative to the panel)
         hotbar_x, hotbar_y = self.hotbar_pos
-        start_x = hotbar_x + (HOTBAR_WIDTH - (HOTBAR_SLOTS * (SLOT_SIZE + SLOT_MARGIN))) // 2
-        start_y = hotbar_y + (HOTBAR_HEIGHT - SLOT_SIZE) // 2
+        start_x, start_y = self.get_hotbar_slot_origin()
+        start_x -= hotbar_x
+        start_y -= hotbar_y
+        drag_source = self.get_drag_source()
         
         # Draw hotbar slots
         for i in range(HOTBAR_SLOTS):
             slot_x = start_x + i * (SLOT_SIZE + SLOT_MARGIN)
             slot_y = start_y
-            
-            # Check if slot is hovered
-            mouse_pos = pygame.mouse.get_pos()
             slot_rect = pygame.Rect(slot_x, slot_y, SLOT_SIZE, SLOT_SIZE)
-            is_hovered = slot_rect.collidepoint(mouse_pos)
+            is_hovered = (i == hovered)
             is_selected = (i == self.selected_hotbar_slot)
             
             # Determine slot color
@@ -112,62 +220,80 @@ class UIManager:
                 slot_color = COLOR_SLOT_EMPTY
             
             # Draw slot background
-            pygame.draw.rect(self.screen, slot_color, slot_rect, border_radius=4)
-            pygame.draw.rect(self.screen, COLOR_UI_BORDER, slot_rect, 1, border_radius=4)
+            self.draw_slot(panel, slot_rect, slot_color)
             
             # Draw slot number
-            number_text = self.small_font.render(str(i + 1), True, COLOR_TEXT_UI)
-            self.screen.blit(number_text, (slot_x + 2, slot_y + 2))
+            number_text = text_cache.render(self.small_font, str(i + 1), COLOR_TEXT_UI)
+            panel.blit(number_text, (slot_x + 2, slot_y + 2))
             
             # Draw item in slot if it exists and we're not dragging from this slot
             if i < len(inventory.hotbar):
                 item = inventory.hotbar[i]
                 if (item and item['count'] > 0 and 
-                    not (self.dragging_item and self.dragging_from_slot == 
-                         ((INVENTORY_ROWS - 1) * INVENTORY_COLS + i))):
+                    drag_source != (INVENTORY_ROWS - 1) * INVENTORY_COLS + i):
                     
                     # Draw item sprite or colored square
-                    self.draw_item(item, slot_x + 4, slot_y + 4)
-        
-        return start_x, start_y
+                    self.draw_item(item, slot_x + 4, slot_y + 4, panel)
+
+    def draw_slot(self, surface, slot_rect, slot_color):
+        """Draw a slot background and border"""
+        # Slots were always drawn straight onto the opaque screen, so keep them opaque on panels too
+        pygame.draw.rect(surface, slot_color[:3], slot_rect, border_radius=4)
+        pygame.draw.rect(surface, COLOR_UI_BORDER[:3], slot_rect, 1, border_radius=4)
     
     def draw_inventory(self, inventory):
         """Draw the full inventory when opened"""
         if not self.inventory_visible:
             return
         
-        # Draw inventory background if texture exists
-        if self.inventory_bg is not None:
-            self.screen.blit(self.inventory_bg, self.inventory_pos)
-        
-        # Calculate slot grid positions
-        inv_x, inv_y = self.inventory_pos
-        grid_width = INVENTORY_COLS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
-        grid_height = INVENTORY_ROWS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
+        mouse_pos = pygame.mouse.get_pos()
+        self.hovered_slot = self.get_inventory_slot_at(mouse_pos)
+
+        # Slots only change with the inventory, hover, hotbar selection and drag state
+        state = (inventory.version, self.selected_hotbar_slot, self.hovered_slot, self.get_drag_source())
+        if state != self.inventory_panel_state:
+            self.build_inventory_panel(inventory)
+            self.inventory_panel_state = state
+            self.panel_rebuilds += 1
+
+        self.screen.blit(self.inventory_panel, self.inventory_rect.topleft)
         
-        start_x = inv_x + (INVENTORY_WIDTH - grid_width) // 2
-        start_y = inv_y + (INVENTORY_HEIGHT - grid_height) // 2
+        # Draw dragged item on top of everything
+        if self.dragging_item:
+            self.draw_item(self.dragging_item, *self.get_drag_rect(mouse_pos).topleft)
         
-        # Draw all inventory slots
-        mouse_pos = pygame.mouse.get_pos()
-        self.hovered_slot = None
+        # Draw hover tooltip (if not dragging)
+        if self.hovered_slot is not None and not self.dragging_item:
+            self.draw_item_tooltip(inventory, mouse_pos[0], mouse_pos[1])
+
+    def build_inventory_panel(self, inventory):
+        """Draw the inventory background, slots and items onto the cached panel"""
+        panel = self.inventory_panel
+        panel.fill((0, 0, 0, 0))
+
+        # Calculate positions relative to the panel
+        panel_x, panel_y = self.inventory_rect.topleft
+        inv_x, inv_y = self.inventory_pos
+        start_x, start_y = self.get_inventory_grid_origin()
+        start_x -= panel_x
+        start_y -= panel_y
+
+        # Draw inventory background if texture exists
+        if self.inventory_bg is not None:
+            panel.blit(self.inventory_bg, (inv_x - panel_x, inv_y - panel_y))
+        drag_source = self.get_drag_source()
         
         for row in range(INVENTORY_ROWS):
             for col in range(INVENTORY_COLS):
                 slot_index = row * INVENTORY_COLS + col
                 slot_x = start_x + col * (SLOT_SIZE + SLOT_MARGIN)
                 slot_y = start_y + row * (SLOT_SIZE + SLOT_MARGIN)
+                slot_rect = pygame.Rect(slot_x, slot_y, SLOT_SIZE, SLOT_SIZE)
                 
                 # Check if this is a hotbar slot (bottom row)
                 is_hotbar_slot = (row == INVENTORY_ROWS - 1)
                 is_selected_hotbar = is_hotbar_slot and (col == self.selected_hotbar_slot)
-                
-                # Check if slot is hovered
-                slot_rect = pygame.Rect(slot_x, slot_y, SLOT_SIZE, SLOT_SIZE)
-                is_hovered = slot_rect.collidepoint(mouse_pos)
-                
-                if is_hovered:
-                    self.hovered_slot = slot_index
+                is_hovered = (slot_index == self.hovered_slot)
                 
                 # Determine slot color
                 if is_selected_hotbar:
@@ -180,87 +306,99 @@ class UIManager:
                     slot_color = COLOR_SLOT_EMPTY
                 
                 # Draw slot background
-                pygame.draw.rect(self.screen, slot_color, slot_rect, border_radius=4)
-                pygame.draw.rect(self.screen, COLOR_UI_BORDER, slot_rect, 1, border_radius=4)
+                self.draw_slot(panel, slot_rect, slot_color)
                 
                 # Draw slot number
                 slot_number = inventory.get_slot_number_display(slot_index)
                 if slot_number:
-                    number_text = self.small_font.render(slot_number, True, COLOR_TEXT_UI)
-                    self.screen.blit(number_text, (slot_x + 2, slot_y + 2))
+                    number_text = text_cache.render(self.small_font, slot_number, COLOR_TEXT_UI)
+                    panel.blit(number_text, (slot_x + 2, slot_y + 2))
                 
                 # Draw item in slot if it exists and we're not dragging from this slot
-                if (slot_index < len(inventory.slots) and 
-                    not (self.dragging_item and self.dragging_from_slot == slot_index)):
+                if slot_index < len(inventory.slots) and drag_source != slot_index:
                     item = inventory.slots[slot_index]
                     if item and item['count'] > 0:
                         # Draw item
-                        self.draw_item(item, slot_x + 4, slot_y + 4)
-        
-        # Draw dragged item on top of everything
-        if self.dragging_item:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            draw_x = mouse_x - self.drag_offset[0]
-            draw_y = mouse_y - self.drag_offset[1]
-            self.draw_item(self.dragging_item, draw_x, draw_y)
-        
-        # Draw hover tooltip (if not dragging)
-        if self.hovered_slot is not None and not self.dragging_item:
-            self.draw_item_tooltip(inventory, mouse_pos[0], mouse_pos[1])
+                        self.draw_item(item, slot_x + 4, slot_y + 4, panel)
     
-    def draw_item(self, item, x, y):
-        """Draw an item at specified position"""
+    def draw_item(self, item, x, y, surface=None):
+        """Draw an item at specified position (on the screen unless a surface is given)"""
+        if surface is None:
+            surface = self.screen
         item_type = item['type']
         
         # Try to use sprite if available
         if item_type in self.item_sprites:
             sprite = self.item_sprites[item_type]
-            self.screen.blit(sprite, (x, y))
+            surface.blit(sprite, (x, y))
             
             # Draw count on top of sprite
             if item['count'] > 1:
-                count_text = self.small_font.render(str(item['count']), True, COLOR_TEXT_UI)
+                count_text = text_cache.render(self.small_font, str(item['count']), COLOR_TEXT_UI)
                 # Draw semi-transparent background for count
-                count_bg = pygame.Surface((count_text.get_width() + 4, count_text.get_height() + 2), 
-                                         pygame.SRCALPHA)
-                count_bg.fill((0, 0, 0, 150))
-                self.screen.blit(count_bg, (x + SLOT_SIZE - 8 - count_text.get_width() - 6, 
-                                          y + SLOT_SIZE - 8 - count_text.get_height() - 2))
-                self.screen.blit(count_text, (x + SLOT_SIZE - 8 - count_text.get_width() - 4, 
-                                            y + SLOT_SIZE - 8 - count_text.get_height()))
+                count_bg = self.get_count_badge(count_text.get_width() + 4, count_text.get_height() + 2)
+                surface.blit(count_bg, (x + SLOT_SIZE - 8 - count_text.get_width() - 6, 
+                                        y + SLOT_SIZE - 8 - count_text.get_height() - 2))
+                surface.blit(count_text, (x + SLOT_SIZE - 8 - count_text.get_width() - 4, 
+                                          y + SLOT_SIZE - 8 - count_text.get_height()))
         else:
             # Fallback to colored square
             item_color = self.get_item_color(item_type)
-            pygame.draw.rect(self.screen, item_color, 
+            pygame.draw.rect(surface, item_color, 
                             (x, y, SLOT_SIZE - 8, SLOT_SIZE - 8), 
                             border_radius=2)
             
             # Draw item count
             if item['count'] > 1:
-                count_text = self.small_font.render(str(item['count']), True, COLOR_TEXT_UI)
-                self.screen.blit(count_text, (x + SLOT_SIZE - 8 - count_text.get_width() - 4, 
-                                            y + SLOT_SIZE - 8 - count_text.get_height() - 2))
+                count_text = text_cache.render(self.small_font, str(item['count']), COLOR_TEXT_UI)
+                surface.blit(count_text, (x + SLOT_SIZE - 8 - count_text.get_width() - 4, 
+                                          y + SLOT_SIZE - 8 - count_text.get_height() - 2))
+
+    def get_count_badge(self, width, height):
+        """Get the semi-transparent count background, reusing one surface per size"""
+        badge = self.count_badges.get((width, height))
+        if badge is None:
+            badge = pygame.Surface((width, height), pygame.SRCALPHA)
+            badge.fill((0, 0, 0, 150))
+            self.count_badges[(width, height)] = badge
+        return badge
     
     # [file name]: ui_manager.py (fix color handling)
     # Update the draw_item_tooltip method:
 
     def draw_item_tooltip(self, inventory, mouse_x, mouse_y):
         """Draw tooltip for hovered item"""
-        if self.hovered_slot >= len(inventory.slots):
+        tooltip = self.get_item_tooltip(inventory, self.hovered_slot, mouse_x, mouse_y)
+        if tooltip is None:
             return
+        name_surf, desc_surf, tooltip_rect = tooltip
+        tooltip_x, tooltip_y = tooltip_rect.topleft
+        padding = 8
+
+        # Draw tooltip with semi-transparent background
+        self.screen.blit(self.get_tooltip_background(*tooltip_rect.size), tooltip_rect)
+        
+        # Draw text
+        self.screen.blit(name_surf, (tooltip_x + padding, tooltip_y + padding))
+        self.screen.blit(desc_surf, (tooltip_x + padding, tooltip_y + padding + name_surf.get_height() + 4))
+
+    def get_item_tooltip(self, inventory, slot, mouse_x, mouse_y):
+        """Get the tooltip text surfaces and screen rect for a slot, or None if it has nothing to show"""
+        if slot is None or slot >= len(inventory.slots):
+            return None
         
-        item = inventory.slots[self.hovered_slot]
+        item = inventory.slots[slot]
         if not item or item['count'] <= 0:
-            return
+            return None
         
         # Create tooltip text
-        slot_number = inventory.get_slot_number_display(self.hovered_slot)
+        slot_number = inventory.get_slot_number_display(slot)
         item_name = ITEM_TYPES.get(item['type'], item['type'].title())
         item_desc = f"Slot: {slot_number} | Count: {item['count']}"
         
         # Render text surfaces
-        name_surf = self.font.render(item_name, True, COLOR_TEXT_UI[:3])  # Use RGB only for font
-        desc_surf = self.small_font.render(item_desc, True, COLOR_TEXT_UI[:3])  # Use RGB only for font
+        name_surf = text_cache.render(self.font, item_name, COLOR_TEXT_UI[:3])  # Use RGB only for font
+        desc_surf = text_cache.render(self.small_font, item_desc, COLOR_TEXT_UI[:3])  # Use RGB only for font
         
         # Calculate tooltip dimensions
         padding = 8
@@ -275,21 +413,21 @@ class UIManager:
             tooltip_x = mouse_x - tooltip_width - 10
         if tooltip_y + tooltip_height > SCREEN_H:
             tooltip_y = mouse_y - tooltip_height - 10
-        
-        # Draw tooltip with semi-transparent background
-        tooltip_surface = pygame.Surface((tooltip_width, tooltip_height), pygame.SRCALPHA)
-        
-        # Use the color directly (it should already have alpha)
-        pygame.draw.rect(tooltip_surface, COLOR_UI_BACKGROUND, 
-                        (0, 0, tooltip_width, tooltip_height), border_radius=4)
-        pygame.draw.rect(tooltip_surface, COLOR_UI_BORDER, 
-                        (0, 0, tooltip_width, tooltip_height), 1, border_radius=4)
-        
-        self.screen.blit(tooltip_surface, (tooltip_x, tooltip_y))
-        
-        # Draw text
-        self.screen.blit(name_surf, (tooltip_x + padding, tooltip_y + padding))
-        self.screen.blit(desc_surf, (tooltip_x + padding, tooltip_y + padding + name_surf.get_height() + 4))
+        return name_surf, desc_surf, pygame.Rect(tooltip_x, tooltip_y, tooltip_width, tooltip_height)
+
+    def get_tooltip_background(self, tooltip_width, tooltip_height):
+        """Get the tooltip background, reusing one surface per size"""
+        tooltip_surface = self.tooltip_backgrounds.get((tooltip_width, tooltip_height))
+        if tooltip_surface is None:
+            tooltip_surface = pygame.Surface((tooltip_width, tooltip_height), pygame.SRCALPHA)
+            
+            # Use the color directly (it should already have alpha)
+            pygame.draw.rect(tooltip_surface, COLOR_UI_BACKGROUND, 
+                            (0, 0, tooltip_width, tooltip_height), border_radius=4)
+            pygame.draw.rect(tooltip_surface, COLOR_UI_BORDER, 
+                            (0, 0, tooltip_width, tooltip_height), 1, border_radius=4)
+            self.tooltip_backgrounds[(tooltip_width, tooltip_height)] = tooltip_surface
+        return tooltip_surface
     
     def handle_events(self, event, inventory):
         """Handle UI-related events including dragging"""
@@ -316,12 +454,7 @@ class UIManager:
                         
                         # Calculate drag offset (where in the item we clicked)
                         mouse_pos = pygame.mouse.get_pos()
-                        inv_x, inv_y = self.inventory_pos
-                        grid_width = INVENTORY_COLS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
-                        grid_height = INVENTORY_ROWS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
-                        
-                        start_x = inv_x + (INVENTORY_WIDTH - grid_width) // 2
-                        start_y = inv_y + (INVENTORY_HEIGHT - grid_height) // 2
+                        start_x, start_y = self.get_inventory_grid_origin()
                         
                         row = self.hovered_slot // INVENTORY_COLS
                         col = self.hovered_slot % INVENTORY_COLS
@@ -369,7 +502,7 @@ class UIManager:
                 inventory.slots[to_slot], from_item
         
         # Update hotbar
-        inventory.sync_hotbar()
+        inventory.mark_changed()
     
     def update(self, inventory):
         """Update UI state"""
@@ -377,28 +510,7 @@ class UIManager:
         
         # Update hovered slot even when dragging
         if self.inventory_visible:
-            mouse_pos = pygame.mouse.get_pos()
-            inv_x, inv_y = self.inventory_pos
-            grid_width = INVENTORY_COLS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
-            grid_height = INVENTORY_ROWS * (SLOT_SIZE + SLOT_MARGIN) - SLOT_MARGIN
-            
-            start_x = inv_x + (INVENTORY_WIDTH - grid_width) // 2
-            start_y = inv_y + (INVENTORY_HEIGHT - grid_height) // 2
-            
-            self.hovered_slot = None
-            
-            for row in range(INVENTORY_ROWS):
-                for col in range(INVENTORY_COLS):
-                    slot_x = start_x + col * (SLOT_SIZE + SLOT_MARGIN)
-                    slot_y = start_y + row * (SLOT_SIZE + SLOT_MARGIN)
-                    
-                    slot_rect = pygame.Rect(slot_x, slot_y, SLOT_SIZE, SLOT_SIZE)
-                    if slot_rect.collidepoint(mouse_pos):
-                        slot_index = row * INVENTORY_COLS + col
-                        self.hovered_slot = slot_index
-                        break
-                if self.hovered_slot is not None:
-                    break
+            self.hovered_slot = self.get_inventory_slot_at(pygame.mouse.get_pos())
     
     def draw(self, inventory):
         """Draw all UI elements"""
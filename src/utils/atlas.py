@@ -0,0 +1,128 @@
+# utils/atlas.py
+"""
+Packs animation frames and tiles into a few large atlas pages and hands out subsurface views of them.
+"""
+import pygame
+from constants import ATLAS_PAGE_SIZE, ATLAS_PADDING
+from utils.loader import surface_bytes
+
+
+class TextureAtlas:
+    def __init__(self, page_size=ATLAS_PAGE_SIZE, padding=ATLAS_PADDING):
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+
+        # Original surface -> subsurface view into a page
+        self.views = {}
+
+        # Memory the packed surfaces used on their own, for comparison
+        self.source_bytes = 0
+        self.packed_pixels = 0
+
+    def pack(self, surfaces):
+        """Copy surfaces into new atlas pages; surfaces too big for a page are left alone"""
+        pending = [surface for surface in dict.fromkeys(surfaces)
+                   if surface is not None and surface not in self.views and self.fits(surface)]
+        # Tallest first, so each shelf wastes little height
+        pending.sort(key=lambda surface: (surface.get_height(), surface.get_width()), reverse=True)
+
+        for layout in self.layout_pages(pending, self.choose_width(pending)):
+            self.build_page(layout)
+
+    def fits(self, surface):
+        """Check whether a surface fits on one page"""
+        width, height = surface.get_size()
+        return 0 < width <= self.page_size and 0 < height <= self.page_size
+
+    def choose_width(self, surfaces):
+        """Pick the shelf width that packs everything into the fewest pages, then the least area"""
+        if not surfaces:
+            return self.page_size
+        widest = max(surface.get_width() for surface in surfaces)
+
+        best_width, best_cost = self.page_size, None
+        for width in range(widest, self.page_size + 1, 16):
+            pages = self.layout_pages(surfaces, width)
+            sizes = [self.get_layout_size(layout) for layout in pages]
+            cost = (len(pages), sum(page_w * page_h for page_w, page_h in sizes))
+            if best_cost is None or cost < best_cost:
+                best_width, best_cost = width, cost
+        return best_width
+
+    def get_layout_size(self, layout):
+        """Get the page size a layout needs"""
+        width = max(x + surface.get_width() for surface, x, y in layout)
+        height = max(y + surface.get_height() for surface, x, y in layout)
+        return width, height
+
+    def layout_pages(self, surfaces, page_width):
+        """Place surfaces on shelves, starting a new page when one fills up"""
+        pages = []
+        layout = []
+        x = y = shelf_height = 0
+        for surface in surfaces:
+            width, height = surface.get_size()
+
+            # Start a new shelf when this row is full
+            if x + width > page_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+
+            # Start a new page when the shelves reach the bottom
+            if y + height > self.page_size:
+                pages.append(layout)
+                layout = []
+                x = y = shelf_height = 0
+
+            layout.append((surface, x, y))
+            x += width + self.padding
+            shelf_height = max(shelf_height, height + self.padding)
+
+        if layout:
+            pages.append(layout)
+        return pages
+
+    def build_page(self, layout):
+        """Create one page surface, copy its surfaces in and make their views"""
+        page = pygame.Surface(self.get_layout_size(layout), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            page = page.convert_alpha()  # Same pixel format as the loaded sprites
+        page.fill((0, 0, 0, 0))
+
+        for surface, x, y in layout:
+            # BLEND_RGBA_ADD onto transparent pixels copies the source exactly, alpha included
+            page.blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+            self.views[surface] = page.subsurface((x, y, surface.get_width(), surface.get_height()))
+            self.source_bytes += surface_bytes(surface)
+            self.packed_pixels += surface.get_width() * surface.get_height()
+
+        self.pages.append(page)
+
+    def get_view(self, surface):
+        """Get the atlas view of a packed surface (or the surface itself if it wasn't packed)"""
+        return self.views.get(surface, surface)
+
+    def pack_animations(self, animations):
+        """Get an animations dict (idle/walk -> direction -> frames) pointing at the atlas views"""
+        if not animations:
+            return animations
+        return {anim_type: {direction: [self.get_view(frame) for frame in frames]
+                            for direction, frames in directions.items()}
+                for anim_type, directions in animations.items()}
+
+    def pack_dict(self, surfaces):
+        """Get a name -> surface dict (like the tileset) pointing at the atlas views"""
+        return {name: self.get_view(surface) for name, surface in surfaces.items()}
+
+    def get_stats(self):
+        """Get packing and memory figures"""
+        page_pixels = sum(page.get_width() * page.get_height() for page in self.pages)
+        return {
+            'pages': len(self.pages),
+            'surfaces': len(self.views),
+            'page_bytes': sum(surface_bytes(page) for page in self.pages),
+            'source_bytes': self.source_bytes,
+            'fill': self.packed_pixels / page_pixels if page_pixels else 0.0
+        }
@@ -39,9 +39,9 @@ def find_sprite_file(filename, search_subfolders=True):
 
 def load_tile_images():
     """Load tile images - uses fallback if missing"""
-    from constants import COLOR_GRASS, COLOR_WATER, COLOR_STONE, COLOR_SAND
+    from constants import COLOR_GRASS, COLOR_WATER, COLOR_STONE, COLOR_SAND, TILE_TYPES
     
-    types = ['grass', 'water', 'stone', 'sand']
+    types = TILE_TYPES
     tiles = {}
     color_map = {
         'grass': COLOR_GRASS,
@@ -115,6 +115,60 @@ def load_entity_animations(entity_name, search_subfolders=True):
     return animations, loaded_files
 
 
+def scale_surface(surface, size, smooth=True):
+    """Scale a surface: smoothly when shrinking, with crisp nearest-neighbour pixels when enlarging"""
+    if smooth and size[0] < surface.get_width() and surface.get_bitsize() >= 24:
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+
+def surface_bytes(surface):
+    """Estimate the memory used by a surface"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def build_mipmaps(surfaces, levels=MIPMAP_LEVELS):
+    """Pre-scale each surface to every zoom level, keyed by surface and then by level"""
+    mipmaps = {}
+    for surface in surfaces:
+        if surface in mipmaps:
+            continue
+        width, height = surface.get_size()
+        mipmaps[surface] = {level: scale_surface(surface, (int(width * level), int(height * level)))
+                            for level in levels}
+    return mipmaps
+
+
+def get_animation_frames(animations):
+    """Get every frame of an animations dict (idle/walk -> direction -> frames)"""
+    if not animations:
+        return []
+    return [frame for directions in animations.values() for frames in directions.values() for frame in frames]
+
+
+def make_trail_frames(frame, alphas=TRAIL_ALPHAS):
+    """Create the faded copies of a frame drawn as the walking trail"""
+    trail_frames = []
+    for alpha in alphas:
+        trail_frame = frame.copy()
+        trail_frame.set_alpha(alpha)
+        trail_frames.append(trail_frame)
+    return trail_frames
+
+
+def build_trail_frames(animations, alphas=TRAIL_ALPHAS):
+    """Pre-render the walking trail copies of every walk frame, keyed by frame"""
+    trail_frames = {}
+    if not animations:
+        return trail_frames
+
+    for frames in animations.get('walk', {}).values():
+        for frame in frames:
+            if frame not in trail_frames:
+                trail_frames[frame] = make_trail_frames(frame, alphas)
+    return trail_frames
+
+
 def load_static_sprite(sprite_name, search_subfolders=True):
     """Load a static sprite (for resources)"""
     loaded_files = []
@@ -178,6 +232,17 @@ def rotate_world_coords_90_cw(x, y, map_width, map_height, current_rotation):
     else:  # 270° clockwise (or 90° counter-clockwise)
         return map_height - 1 - y, x
 
+def unrotate_world_coords_90_cw(x, y, map_width, map_height, current_rotation):
+    """Undo rotate_world_coords_90_cw: get the unrotated coordinates of a rotated position"""
+    if current_rotation % 4 == 0:
+        return x, y
+    elif current_rotation % 4 == 1:
+        return map_width - 1 - y, x
+    elif current_rotation % 4 == 2:
+        return map_width - 1 - x, map_height - 1 - y
+    else:
+        return y, map_height - 1 - x
+
 def rotate_direction_90_cw(direction, rotations):
     """Rotate a facing direction by 90-degree increments"""
     directions = ['north', 'east', 'south', 'west']
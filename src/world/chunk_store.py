@@ -0,0 +1,164 @@
+# world/chunk_store.py
+"""
+Persistent world file: one fixed-size record per map chunk (tile codes plus the monsters and
+resources placed in it), read and written in place through mmap.
+
+Layout (little-endian):
+    header   magic 'IRWD', version u16, chunk size u16, map w u32, map h u32, seed u64, entity slots u32
+    records  chunks_x * chunks_y records, chunk (cx, cy) at index cx * chunks_y + cy:
+             flags u8, pad u8, entity count u16, pad u32, tiles (chunk size² bytes, [x, y] order),
+             entity slots * (kind u8, local x u8, local y u8, hp u8)
+
+The file is created sparse at full size, so opening or creating a world takes the same time
+however big it is; only chunks that were visited ever use disk space.
+"""
+import mmap
+import os
+import struct
+import numpy as np
+from constants import WORLD_CHUNK_SIZE, WORLD_FILE_ENTITY_SLOTS
+
+MAGIC = b'IRWD'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQI')
+RECORD_HEADER = struct.Struct('<BBHI')
+ENTITY_DTYPE = np.dtype([('kind', 'u1'), ('x', 'u1'), ('y', 'u1'), ('hp', 'u1')])
+
+# Record flags
+HAS_TILES = 1  # The chunk's tiles were saved (otherwise they are generated from the seed)
+HAS_ENTITIES = 2  # The chunk's entities were saved (otherwise it has none yet)
+
+# Entity kinds
+ENTITY_MONSTER = 0
+ENTITY_RESOURCE = 1
+
+
+class ChunkStore:
+    def __init__(self, path, file, data, chunk_size, w, h, seed, entity_slots):
+        self.path = path
+        self.file = file
+        self.data = data  # The mmap of the whole file
+        self.chunk_size = chunk_size
+        self.w = w
+        self.h = h
+        self.seed = seed
+        self.entity_slots = entity_slots
+
+        self.chunks_x = (w + chunk_size - 1) // chunk_size
+        self.chunks_y = (h + chunk_size - 1) // chunk_size
+        self.tile_bytes = chunk_size * chunk_size
+        self.record_size = RECORD_HEADER.size + self.tile_bytes + entity_slots * ENTITY_DTYPE.itemsize
+
+    @classmethod
+    def create(cls, path, w, h, seed, chunk_size=WORLD_CHUNK_SIZE, entity_slots=WORLD_FILE_ENTITY_SLOTS):
+        """Create an empty world file (every chunk still to be generated) and open it"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        chunks = ((w + chunk_size - 1) // chunk_size) * ((h + chunk_size - 1) // chunk_size)
+        record_size = RECORD_HEADER.size + chunk_size * chunk_size + entity_slots * ENTITY_DTYPE.itemsize
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, chunk_size, w, h, seed, entity_slots))
+            f.truncate(HEADER.size + chunks * record_size)  # Sparse: unwritten records read as zeros
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """Open an existing world file"""
+        file = open(path, 'r+b')
+        try:
+            magic, version, chunk_size, w, h, seed, entity_slots = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a world file")
+            if version != VERSION:
+                raise ValueError(f"{path} has world file version {version}, expected {VERSION}")
+            data = mmap.mmap(file.fileno(), 0)
+        except Exception:
+            file.close()
+            raise
+        return cls(path, file, data, chunk_size, w, h, seed, entity_slots)
+
+    @classmethod
+    def open_or_create(cls, path, w, h, seed, chunk_size=WORLD_CHUNK_SIZE):
+        """Open a world file, creating it first if it doesn't exist; returns (store, created)"""
+        if os.path.exists(path):
+            return cls.open(path), False
+        return cls.create(path, w, h, seed, chunk_size), True
+
+    def get_offset(self, cx, cy):
+        """Get the file offset of a chunk's record"""
+        if not (0 <= cx < self.chunks_x and 0 <= cy < self.chunks_y):
+            raise IndexError(f"chunk {(cx, cy)} is outside the world")
+        return HEADER.size + (cx * self.chunks_y + cy) * self.record_size
+
+    def get_record_header(self, cx, cy):
+        """Get (flags, entity count) of a chunk"""
+        flags, _, count, _ = RECORD_HEADER.unpack_from(self.data, self.get_offset(cx, cy))
+        return flags, count
+
+    def set_record_header(self, cx, cy, flags, count):
+        """Write the flags and entity count of a chunk"""
+        RECORD_HEADER.pack_into(self.data, self.get_offset(cx, cy), flags, 0, count, 0)
+
+    def read_tiles(self, cx, cy):
+        """Get a chunk's saved tile codes, or None if they were never saved"""
+        flags, _ = self.get_record_header(cx, cy)
+        if not flags & HAS_TILES:
+            return None
+        offset = self.get_offset(cx, cy) + RECORD_HEADER.size
+        tiles = np.frombuffer(self.data, dtype=np.uint8, count=self.tile_bytes, offset=offset)
+        return tiles.reshape(self.chunk_size, self.chunk_size).copy()
+
+    def write_tiles(self, cx, cy, tiles):
+        """Save a chunk's tile codes"""
+        offset = self.get_offset(cx, cy) + RECORD_HEADER.size
+        self.data[offset:offset + self.tile_bytes] = np.ascontiguousarray(tiles, dtype=np.uint8).tobytes()
+        flags, count = self.get_record_header(cx, cy)
+        self.set_record_header(cx, cy, flags | HAS_TILES, count)
+
+    def read_entities(self, cx, cy):
+        """Get the entity records (an ENTITY_DTYPE array) stored for a chunk
+
+        The record stays as it is until the chunk is written back, so a game that never gets
+        to write it back (a crash) finds the chunk as it was loaded.
+        """
+        flags, count = self.get_record_header(cx, cy)
+        if not flags & HAS_ENTITIES:
+            return np.zeros(0, dtype=ENTITY_DTYPE)
+        offset = self.get_offset(cx, cy) + RECORD_HEADER.size + self.tile_bytes
+        return np.frombuffer(self.data, dtype=ENTITY_DTYPE, count=count, offset=offset).copy()
+
+    def write_entities(self, cx, cy, records):
+        """Replace the entity records of a chunk; returns how many fitted"""
+        flags, _ = self.get_record_header(cx, cy)
+        stored = min(len(records), self.entity_slots)
+        offset = self.get_offset(cx, cy) + RECORD_HEADER.size + self.tile_bytes
+        self.data[offset:offset + stored * ENTITY_DTYPE.itemsize] = \
+            np.asarray(records[:stored], dtype=ENTITY_DTYPE).tobytes()
+        self.set_record_header(cx, cy, flags | HAS_ENTITIES, stored)
+        return stored
+
+    def add_entities(self, cx, cy, records):
+        """Store entity records for a chunk, after any already stored; returns how many fitted"""
+        flags, count = self.get_record_header(cx, cy)
+        if not flags & HAS_ENTITIES:
+            count = 0
+        stored = min(len(records), self.entity_slots - count)
+        offset = self.get_offset(cx, cy) + RECORD_HEADER.size + self.tile_bytes + count * ENTITY_DTYPE.itemsize
+        self.data[offset:offset + stored * ENTITY_DTYPE.itemsize] = \
+            np.asarray(records[:stored], dtype=ENTITY_DTYPE).tobytes()
+        self.set_record_header(cx, cy, flags | HAS_ENTITIES, count + stored)
+        return stored
+
+    def flush(self):
+        """Write changed pages back to the file"""
+        self.data.flush()
+
+    def close(self):
+        """Flush and close the file"""
+        if self.data is not None:
+            self.data.flush()
+            self.data.close()
+            self.file.close()
+            self.data = None
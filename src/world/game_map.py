@@ -1,65 +1,261 @@
 import random
-from constants import MAP_W, MAP_H
+from collections import OrderedDict
+import numpy as np
+from constants import MAP_W, MAP_H, TILE_TYPES, WORLD_CHUNK_SIZE, WORLD_CHUNK_CACHE, WORLD_CHUNK_KEEP_RADIUS
+from utils.loader import unrotate_world_coords_90_cw
+from world.terrain_gen import TerrainGenerator
+
+# Tile type name -> one-byte code stored in the grid
+TILE_CODES = {tile_type: code for code, tile_type in enumerate(TILE_TYPES)}
 
 
-# Update game_map.py
 class GameMap:
-    def __init__(self, w=MAP_W, h=MAP_H):
+    def __init__(self, w=MAP_W, h=MAP_H, seed=None, chunk_size=WORLD_CHUNK_SIZE, max_chunks=WORLD_CHUNK_CACHE,
+                 store=None):
+        # A world file (ChunkStore) decides the size, seed and chunk size of the world it holds
+        self.store = store
+        if store is not None:
+            w, h, seed, chunk_size = store.w, store.h, store.seed, store.chunk_size
+
         self.w = w
         self.h = h
-        self.rotation = 0  # 0, 1, 2, 3 for 0°, 90°, 180°, 270°
-        self.original_tiles = [[self.random_tile(x, y) for y in range(h)] for x in range(w)]
-        self.tiles = [row[:] for row in self.original_tiles]
+
+        # Terrain is a pure function of the seed and the tile position, so an evicted chunk comes back
+        # identical. Without a seed one is drawn from the random module, so random.seed() still reproduces a map
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.generator = TerrainGenerator(self.seed)
+
+        # Tile codes in world coordinates, one byte per tile, in chunk_size x chunk_size arrays
+        # indexed [x, y] and created on first access. Rotation never touches them: the camera
+        # rotates the view (see get_region)
+        self.chunk_size = chunk_size
+        self.chunk_shift = chunk_size.bit_length() - 1
+        self.chunk_mask = chunk_size - 1
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (chunk x, chunk y) -> codes, least recently used first
+
+        # Changed chunks can't be regenerated: they are written to the world file before being
+        # evicted, or stay in memory when there is no file
+        self.modified_chunks = set()
+        # Chunks whose arrays a save in progress is still reading: set_tile copies them before writing
+        self.shared_chunks = set()
+        # Chunk the player is in; chunks around it are kept
+        self.focus_chunk = None
+
         self.resources = {}
+        self.tile_listeners = []  # Called as listener(game_map, x, y) when a tile changes
+        self.chunk_listeners = []  # Called as listener(game_map, cx, cy, loaded) when a chunk loads or unloads
 
-    def rotate_90_clockwise(self):
-        """Rotate the map 90 degrees clockwise"""
-        self.rotation = (self.rotation + 1) % 4
+    def generate_chunk(self, cx, cy):
+        """Generate the tile codes of a whole chunk at once"""
+        size = self.chunk_size
+        return self.generator.generate(cx * size, cy * size, size, size)
 
-        # Rotate the tile grid
-        self.tiles = self._rotate_grid_90_clockwise(self.tiles)
+    def get_chunk(self, cx, cy):
+        """Get the tile codes of a chunk, loading or generating it on first access"""
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
 
-        # Swap width and height
-        self.w, self.h = self.h, self.w
+        chunk = self.store.read_tiles(cx, cy) if self.store is not None else None
+        if chunk is None:
+            chunk = self.generate_chunk(cx, cy)
+        self.chunks[key] = chunk
+        for listener in self.chunk_listeners:
+            listener(self, cx, cy, True)
+        self.evict()
+        return chunk
 
-    def _rotate_grid_90_clockwise(self, grid):
-        """Helper to rotate a 2D grid 90 degrees clockwise"""
-        if not grid:
-            return grid
+    def set_focus(self, x, y):
+        """Tell the map where the player is, so the chunks around it stay loaded"""
+        focus_chunk = (int(x) >> self.chunk_shift, int(y) >> self.chunk_shift)
+        if focus_chunk == self.focus_chunk:
+            return
+        self.focus_chunk = focus_chunk
 
-        h = len(grid)
-        w = len(grid[0])
-        rotated = [[None for _ in range(h)] for _ in range(w)]
+        # With a world file, page in the chunks next to the player before they scroll into view,
+        # so their monsters are already about
+        if self.store is not None:
+            for cx in range(focus_chunk[0] - 1, focus_chunk[0] + 2):
+                for cy in range(focus_chunk[1] - 1, focus_chunk[1] + 2):
+                    if 0 <= cx < self.store.chunks_x and 0 <= cy < self.store.chunks_y:
+                        self.get_chunk(cx, cy)
 
-        for y in range(h):
-            for x in range(w):
-                rotated[x][h - 1 - y] = grid[y][x]
+    def evict(self):
+        """Drop least recently used chunks past the cache size, except modified ones and those near the player"""
+        if len(self.chunks) <= self.max_chunks:
+            return
+        focus_x, focus_y = self.focus_chunk or (0, 0)
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if key in self.modified_chunks and self.store is None:
+                continue
+            if max(abs(key[0] - focus_x), abs(key[1] - focus_y)) <= WORLD_CHUNK_KEEP_RADIUS:
+                continue
+            self.unload_chunk(key)
 
-        return rotated
+    def unload_chunk(self, key):
+        """Drop a chunk from memory, saving it first if it changed"""
+        if key in self.modified_chunks:
+            self.store.write_tiles(key[0], key[1], self.chunks[key])
+            self.modified_chunks.discard(key)
+        del self.chunks[key]
+        for listener in self.chunk_listeners:
+            listener(self, key[0], key[1], False)
 
-    def get_tile_at_world(self, world_x, world_y):
-        """Get tile at world coordinates, taking rotation into account"""
-        # For now, just return the tile at the grid position
-        if self.in_bounds(world_x, world_y):
-            return self.tiles[world_x][world_y]
-        return 'grass'
+    def save(self):
+        """Write every changed chunk to the world file"""
+        if self.store is None:
+            return
+        for key in self.modified_chunks:
+            self.store.write_tiles(key[0], key[1], self.chunks[key])
+        self.modified_chunks.clear()
+        self.store.flush()
 
-    # ... rest of the class remains the same ...
+    def share_modified_chunks(self):
+        """Get the changed chunks for a save snapshot, copy-on-write: they are only copied if changed again
 
-    def random_tile(self, x, y):
-        r = random.random()
-        if r < 0.06:
-            return 'water'
-        if r < 0.13:
-            return 'stone'
-        if r < 0.2:
-            return 'sand'
-        return 'grass'
+        The returned set is the one set_tile checks; clear it once the snapshot has been written.
+        """
+        self.shared_chunks = set(self.modified_chunks)
+        return {key: self.chunks[key] for key in self.modified_chunks}, self.shared_chunks
+
+    def reset(self, w, h, seed, chunk_size, chunks):
+        """Switch to another world (a loaded save): its size and seed, plus the changed chunks it kept"""
+        self.w = w
+        self.h = h
+        self.seed = seed
+        self.generator = TerrainGenerator(seed)
+        self.chunk_size = chunk_size
+        self.chunk_shift = chunk_size.bit_length() - 1
+        self.chunk_mask = chunk_size - 1
+
+        self.chunks = OrderedDict(chunks)
+        self.modified_chunks = set(chunks)
+        self.shared_chunks = set()
+        self.focus_chunk = None
+
+    def get_chunk_key(self, x, y):
+        """Get the (chunk x, chunk y) a tile is in"""
+        return int(x) >> self.chunk_shift, int(y) >> self.chunk_shift
+
+    def is_chunk_loaded(self, cx, cy):
+        """Check whether a chunk is in memory"""
+        return (cx, cy) in self.chunks
+
+    def get_view_size(self, rotation=0):
+        """Get the map size as seen after rotation quarter turns"""
+        if rotation % 2:
+            return self.h, self.w
+        return self.w, self.h
+
+    def get_tile_at_world(self, world_x, world_y):
+        """Get tile at world coordinates"""
+        return self.get_tile_type(world_x, world_y)
 
     def in_bounds(self, x, y):
         return 0 <= x < self.w and 0 <= y < self.h
     
     def get_tile_type(self, x, y):
         if self.in_bounds(x, y):
-            return self.tiles[x][y]
-        return 'grass'
\ No newline at end of file
+            return TILE_TYPES[self.get_tile_code(x, y)]
+        return 'grass'
+
+    def get_tile_code(self, x, y):
+        """Get the code of a tile (grass outside the map)"""
+        if not self.in_bounds(x, y):
+            return TILE_CODES['grass']
+        chunk = self.get_chunk(x >> self.chunk_shift, y >> self.chunk_shift)
+        return int(chunk[x & self.chunk_mask, y & self.chunk_mask])
+
+    def get_world_region(self, x0, y0, x1, y1):
+        """Get a copy of the tile codes in world x0..x1, y0..y1 (inclusive), clipped to the map"""
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.w - 1, x1), min(self.h - 1, y1)
+        if x1 < x0 or y1 < y0:
+            return np.zeros((max(0, x1 - x0 + 1), max(0, y1 - y0 + 1)), dtype=np.uint8)
+
+        region = np.empty((x1 - x0 + 1, y1 - y0 + 1), dtype=np.uint8)
+        shift, size = self.chunk_shift, self.chunk_size
+        for cx in range(x0 >> shift, (x1 >> shift) + 1):
+            for cy in range(y0 >> shift, (y1 >> shift) + 1):
+                chunk = self.get_chunk(cx, cy)
+                # Overlap of this chunk and the region, in world coordinates
+                ax, bx = max(x0, cx * size), min(x1, cx * size + size - 1)
+                ay, by = max(y0, cy * size), min(y1, cy * size + size - 1)
+                region[ax - x0:bx - x0 + 1, ay - y0:by - y0 + 1] = \
+                    chunk[ax - cx * size:bx - cx * size + 1, ay - cy * size:by - cy * size + 1]
+        return region
+
+    def get_region(self, x0, y0, x1, y1, rotation=0):
+        """Get the tile codes in x0..x1, y0..y1 (inclusive, in view coordinates at a rotation), clipped to the map"""
+        view_w, view_h = self.get_view_size(rotation)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(view_w - 1, x1), min(view_h - 1, y1)
+        if x1 < x0 or y1 < y0:
+            return np.zeros((max(0, x1 - x0 + 1), max(0, y1 - y0 + 1)), dtype=np.uint8)
+        if not rotation % 4:
+            return self.get_world_region(x0, y0, x1, y1)
+
+        # A view rectangle is a world rectangle turned on its side: load that, then turn it the same way.
+        # View tile (x, y) is world tile (w - 1 - y, x) per turn, which is what np.rot90(..., -1) does
+        corners = [unrotate_world_coords_90_cw(x, y, self.w, self.h, rotation) for x, y in ((x0, y0), (x1, y1))]
+        xs = [corner[0] for corner in corners]
+        ys = [corner[1] for corner in corners]
+        region = self.get_world_region(min(xs), min(ys), max(xs), max(ys))
+        return np.rot90(region, -rotation)
+
+    def iter_chunks(self):
+        """Yield (x0, y0, codes) for every chunk of the map, clipped to the map edges"""
+        size = self.chunk_size
+        for cx in range((self.w + size - 1) // size):
+            for cy in range((self.h + size - 1) // size):
+                chunk = self.get_chunk(cx, cy)
+                yield cx * size, cy * size, chunk[:self.w - cx * size, :self.h - cy * size]
+
+    def get_tile_mask(self, tile_type, region):
+        """Get a boolean array marking the tiles of one type in a region (see get_region)"""
+        return region == TILE_CODES[tile_type]
+
+    def find_tiles(self, tile_type):
+        """Get an (n, 2) array of the x, y positions of every tile of one type"""
+        found = [np.argwhere(self.get_tile_mask(tile_type, codes)) + (x0, y0)
+                 for x0, y0, codes in self.iter_chunks()]
+        return np.concatenate(found) if found else np.zeros((0, 2), dtype=np.intp)
+
+    def count_tiles(self):
+        """Count the tiles of each type, one chunk at a time"""
+        counts = np.zeros(len(TILE_TYPES), dtype=np.int64)
+        for _, _, codes in self.iter_chunks():
+            counts += np.bincount(codes.ravel(), minlength=len(TILE_TYPES))
+        return {tile_type: int(counts[code]) for code, tile_type in enumerate(TILE_TYPES)}
+
+    def set_tile(self, x, y, tile_type):
+        """Change a tile and notify listeners (e.g. the terrain cache)"""
+        code = TILE_CODES[tile_type]
+        if not self.in_bounds(x, y):
+            return False
+        cx, cy = x >> self.chunk_shift, y >> self.chunk_shift
+        chunk = self.get_chunk(cx, cy)
+        if chunk[x & self.chunk_mask, y & self.chunk_mask] == code:
+            return False
+        if (cx, cy) in self.shared_chunks:
+            # A save is still writing the old array out; change a copy instead
+            self.shared_chunks.discard((cx, cy))
+            chunk = self.chunks[(cx, cy)] = chunk.copy()
+        chunk[x & self.chunk_mask, y & self.chunk_mask] = code
+        self.modified_chunks.add((cx, cy))
+        for listener in self.tile_listeners:
+            listener(self, x, y)
+        return True
+
+    def add_tile_listener(self, listener):
+        """Register a callback for tile changes"""
+        self.tile_listeners.append(listener)
+
+    def add_chunk_listener(self, listener):
+        """Register a callback for chunks loading into and unloading from memory"""
+        self.chunk_listeners.append(listener)
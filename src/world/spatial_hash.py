@@ -0,0 +1,98 @@
+# world/spatial_hash.py
+"""
+Spatial hash: entities bucketed by the square cell of tiles they stand in, so finding what is
+on a tile, next to it or within a radius only looks at a few cells instead of every entity.
+"""
+from constants import SPATIAL_CELL_SIZE
+
+
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        # Cells are cell_size x cell_size tiles (a power of two, so a tile's cell is a shift away)
+        self.cell_size = cell_size
+        self.cell_shift = cell_size.bit_length() - 1
+        self.buckets = {}  # (cell x, cell y) -> entities standing in it, in insertion order
+
+    def get_cell(self, x, y):
+        """Get the cell a tile is in"""
+        return int(x) >> self.cell_shift, int(y) >> self.cell_shift
+
+    def insert(self, entity):
+        """Add an entity; it keeps its cell up to date through set_position from then on"""
+        cell = self.get_cell(entity.x, entity.y)
+        self.buckets.setdefault(cell, []).append(entity)
+        entity.spatial_index = self
+        entity.spatial_cell = cell
+
+    def remove(self, entity):
+        """Take an entity out of the index (does nothing if it isn't in it)"""
+        if entity.spatial_index is not self:
+            return
+        bucket = self.buckets[entity.spatial_cell]
+        bucket.remove(entity)
+        if not bucket:
+            del self.buckets[entity.spatial_cell]
+        entity.spatial_index = None
+        entity.spatial_cell = None
+
+    def move(self, entity):
+        """Re-bucket an entity after its position changed (only costs anything when it changes cell)"""
+        cell = self.get_cell(entity.x, entity.y)
+        if cell == entity.spatial_cell:
+            return
+        bucket = self.buckets[entity.spatial_cell]
+        bucket.remove(entity)
+        if not bucket:
+            del self.buckets[entity.spatial_cell]
+        self.buckets.setdefault(cell, []).append(entity)
+        entity.spatial_cell = cell
+
+    def clear(self):
+        """Remove every entity"""
+        for bucket in self.buckets.values():
+            for entity in bucket:
+                entity.spatial_index = None
+                entity.spatial_cell = None
+        self.buckets.clear()
+
+    def rebuild(self, *entity_lists):
+        """Index exactly the entities in the given lists"""
+        self.clear()
+        # insert() inlined: this runs over every entity when a save is loaded
+        buckets, shift = self.buckets, self.cell_shift
+        for entities in entity_lists:
+            for entity in entities:
+                cell = (entity.x >> shift, entity.y >> shift)
+                bucket = buckets.get(cell)
+                if bucket is None:
+                    buckets[cell] = [entity]
+                else:
+                    bucket.append(entity)
+                entity.spatial_index = self
+                entity.spatial_cell = cell
+
+    def query_tile(self, x, y):
+        """Get the entities standing on a tile"""
+        bucket = self.buckets.get(self.get_cell(x, y), ())
+        return [entity for entity in bucket if entity.x == x and entity.y == y]
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Get the entities in tiles x0..x1, y0..y1 (inclusive)"""
+        found = []
+        shift = self.cell_shift
+        for cx in range(int(x0) >> shift, (int(x1) >> shift) + 1):
+            for cy in range(int(y0) >> shift, (int(y1) >> shift) + 1):
+                bucket = self.buckets.get((cx, cy))
+                if bucket:
+                    found.extend(entity for entity in bucket
+                                 if x0 <= entity.x <= x1 and y0 <= entity.y <= y1)
+        return found
+
+    def query_radius(self, x, y, radius):
+        """Get the entities at most radius tiles away along both axes (a square, like the distant-monster test)"""
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius)
+
+    def query_neighbors(self, x, y):
+        """Get the entities on the four tiles next to a tile (the ones an attack reaches)"""
+        return [entity for entity in self.query_rect(x - 1, y - 1, x + 1, y + 1)
+                if abs(entity.x - x) + abs(entity.y - y) == 1]
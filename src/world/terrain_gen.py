@@ -0,0 +1,82 @@
+# world/terrain_gen.py
+"""
+Seeded value-noise terrain: whole blocks of tiles are generated at once with NumPy, and the
+same seed always gives the same world, whatever order its chunks are generated in.
+"""
+import numpy as np
+from constants import TILE_TYPES, TERRAIN_SCALE, TERRAIN_OCTAVES, TERRAIN_PERSISTENCE, TERRAIN_WATER_LEVEL, \
+    TERRAIN_SAND_LEVEL, TERRAIN_STONE_LEVEL
+
+GRASS, WATER, STONE, SAND = (TILE_TYPES.index(tile_type) for tile_type in ('grass', 'water', 'stone', 'sand'))
+
+MASK_32 = 0xFFFFFFFF
+
+
+class TerrainGenerator:
+    def __init__(self, seed, scale=TERRAIN_SCALE, octaves=TERRAIN_OCTAVES, persistence=TERRAIN_PERSISTENCE):
+        self.seed = seed
+        self.scale = scale
+        self.octaves = octaves
+        self.persistence = persistence
+
+        # A different 32-bit hash salt per octave, so octaves don't line up
+        rng = np.random.default_rng(seed)
+        self.salts = [int(salt) for salt in rng.integers(1, MASK_32, size=octaves)]
+
+    def generate(self, x0, y0, w, h):
+        """Get a (w, h) uint8 array of tile codes for world tiles x0..x0+w-1, y0..y0+h-1"""
+        elevation = self.get_elevation(x0, y0, w, h)
+
+        tiles = np.full((w, h), GRASS, dtype=np.uint8)
+        tiles[elevation < TERRAIN_SAND_LEVEL] = SAND  # Beaches around the water
+        tiles[elevation < TERRAIN_WATER_LEVEL] = WATER
+        tiles[elevation > TERRAIN_STONE_LEVEL] = STONE  # Rocky high ground
+        return tiles
+
+    def get_elevation(self, x0, y0, w, h):
+        """Get fractal value noise in 0..1 for a block of tiles, summed over the octaves"""
+        total = np.zeros((w, h), dtype=np.float32)
+        amplitude = 1.0
+        amplitude_sum = 0.0
+        cell = float(self.scale)
+        for salt in self.salts:
+            total += amplitude * self.value_noise(x0, y0, w, h, cell, salt)
+            amplitude_sum += amplitude
+            amplitude *= self.persistence
+            cell /= 2
+        return total / amplitude_sum
+
+    def value_noise(self, x0, y0, w, h, cell, salt):
+        """Smoothly interpolate random lattice values spaced cell tiles apart"""
+        # Tile positions in lattice units, split into the lattice cell and the offset inside it
+        xs = (np.arange(x0, x0 + w, dtype=np.float64) + 0.5) / cell
+        ys = (np.arange(y0, y0 + h, dtype=np.float64) + 0.5) / cell
+        ix = np.floor(xs).astype(np.int64)
+        iy = np.floor(ys).astype(np.int64)
+        fx = self.fade(xs - ix).astype(np.float32)[:, None]
+        fy = self.fade(ys - iy).astype(np.float32)[None, :]
+
+        # Hash only the lattice points the block touches, then look them up per tile
+        base_x, base_y = ix[0], iy[0]
+        lattice = self.hash_lattice(np.arange(base_x, ix[-1] + 2), np.arange(base_y, iy[-1] + 2), salt)
+        lx = (ix - base_x)[:, None]
+        ly = (iy - base_y)[None, :]
+        v00 = lattice[lx, ly]
+        v10 = lattice[lx + 1, ly]
+        v01 = lattice[lx, ly + 1]
+        v11 = lattice[lx + 1, ly + 1]
+
+        top = v00 + (v10 - v00) * fx
+        bottom = v01 + (v11 - v01) * fx
+        return top + (bottom - top) * fy
+
+    def fade(self, t):
+        """Smoothstep easing, so the noise has no creases at lattice lines"""
+        return t * t * (3 - 2 * t)
+
+    def hash_lattice(self, xs, ys, salt):
+        """Get a deterministic pseudo-random value in 0..1 for every (x, y) lattice point"""
+        h = (xs[:, None] * 374761393 + ys[None, :] * 668265263 + salt) & MASK_32
+        h = ((h ^ (h >> 13)) * 1274126177) & MASK_32
+        h ^= h >> 16
+        return (h & 0xFFFF).astype(np.float32) / 0xFFFF
@@ -0,0 +1,22 @@
+# tests/conftest.py
+"""
+Shared test setup: the game's modules live in src/ and run headless on SDL's dummy drivers.
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import pytest
+
+
+@pytest.fixture
+def game():
+    """A small in-memory game, closed again after the test"""
+    import pygame
+    from engine.game import Game
+    game = Game(40, 40, 20, 20, seed=1, world_file=None)
+    yield game
+    pygame.quit()
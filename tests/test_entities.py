@@ -0,0 +1,35 @@
+# tests/test_entities.py
+"""
+Entity bookkeeping: killing and gathering take entities out of the lists and the spatial hash.
+"""
+
+
+def assert_positions(entities):
+    assert all(entity.list_position == i for i, entity in enumerate(entities))
+
+
+def test_attack_removes_killed_monster(game):
+    player, monsters = game.player, game.monsters
+    monster = monsters[0]
+    player.set_position(monster.x + 1 if monster.x + 1 < game.game_map.w else monster.x - 1, monster.y)
+
+    while monster in monsters:
+        assert player.attack(monsters)
+
+    assert monster.spatial_index is None
+    assert monster.list_position is None
+    assert_positions(monsters)
+
+
+def test_gather_removes_resource(game):
+    player, resources = game.player, game.resources
+    resource = resources[0]
+    count = len(resources)
+    player.set_position(resource.x, resource.y)
+
+    assert player.gather_resource(resources, game.inventory)
+
+    assert len(resources) == count - 1
+    assert resource not in resources
+    assert resource.spatial_index is None
+    assert_positions(resources)
@@ -0,0 +1,41 @@
+# tests/test_render_manager.py
+"""
+Dirty-rect presentation: whatever changes on screen has to end up in the presented rects.
+"""
+
+
+def open_inventory(game):
+    """Switch to dirty-rect mode with the inventory open and the debug overlay (redrawn every frame) off"""
+    game.render_manager.set_dirty_rects(True)
+    game.show_debug = False
+    game.ui_manager.inventory_visible = True
+    render_frame(game)
+    render_frame(game)
+
+
+def render_frame(game):
+    """Update and render one frame, returning the rects it would present (None for the whole screen)"""
+    game.update(16)
+    game.render_manager.render(game.game_map, game.rotation)
+    return game.render_manager.pending_rects
+
+
+def test_inventory_slot_change_is_presented(game):
+    open_inventory(game)
+
+    game.inventory.add_item('resource', 1)
+    rects = render_frame(game)
+
+    inventory_rect = game.ui_manager.inventory_rect
+    assert rects is not None
+    assert any(rect.contains(inventory_rect) for rect in rects)
+
+
+def test_unchanged_inventory_is_not_repainted(game):
+    open_inventory(game)
+
+    rects = render_frame(game)
+
+    inventory_rect = game.ui_manager.inventory_rect
+    assert rects is not None
+    assert not any(rect.contains(inventory_rect) for rect in rects)
@@ -0,0 +1,42 @@
+# tests/test_surface_cache.py
+"""
+Scaled surface cache: mipmaps, and the smooth/nearest-neighbour switch used by the quality governor.
+"""
+import pygame
+from constants import MIPMAP_LEVELS, ZOOM_MIN, DEFAULT_ZOOM, ZOOM_SPEED
+from engine.surface_cache import ScaledSurfaceCache
+from utils.loader import build_mipmaps
+
+
+def make_checkerboard(width=64, height=32):
+    """A surface of single-pixel checks, which smoothing and nearest-neighbour scale very differently"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for x in range(width):
+        for y in range(height):
+            surface.set_at((x, y), (255, 255, 255, 255) if (x + y) % 2 else (0, 0, 0, 255))
+    return surface
+
+
+def test_mipmap_levels_are_served_when_smooth():
+    surface = make_checkerboard()
+    mipmaps = build_mipmaps([surface])
+    cache = ScaledSurfaceCache()
+    cache.add_mipmaps(mipmaps)
+
+    assert cache.get(surface, MIPMAP_LEVELS[0]) is mipmaps[surface][MIPMAP_LEVELS[0]]
+
+
+def test_nearest_scaling_differs_from_smooth_at_reachable_zooms():
+    surface = make_checkerboard()
+    cache = ScaledSurfaceCache()
+    cache.add_mipmaps(build_mipmaps([surface]))
+
+    # Every zoom the mouse wheel can reach below 1.0 lands on a mipmap level
+    zoom = DEFAULT_ZOOM - ZOOM_SPEED * 5
+    assert zoom > ZOOM_MIN
+    smooth = pygame.image.tobytes(cache.get(surface, zoom), 'RGBA')
+    assert cache.set_smooth(False)
+    nearest = cache.get(surface, zoom)
+
+    assert nearest.get_size() == (int(64 * cache.quantize_zoom(zoom)), int(32 * cache.quantize_zoom(zoom)))
+    assert pygame.image.tobytes(nearest, 'RGBA') != smooth